@@ -0,0 +1,131 @@
+import numpy as np
+
+from gmsh_mesher import mesh_plate
+from isoparametric import QUADRATURE, jacobian, shape_functions
+from mesh_io import element_type_for
+from model_builder import run_model
+from results import gauss_stresses, nodal_stresses
+
+# Bounds on how much an element may shrink or grow in one refinement step
+MIN_SIZE_RATIO = 0.25
+MAX_SIZE_RATIO = 2.0
+
+# Polynomial order p of the displacement field per element type, the error of an element of size h scales as h^p
+ELEMENT_ORDER = {'tri31': 1, 'quad4': 1, 'tri6': 2, 'quad8': 2, 'quad9': 2}
+
+# Refinement has stalled when an iteration changes the DOF count and the error by less than this fraction
+STALL_TOLERANCE = 0.03
+
+
+# Function to build and solve a plane-stress wall: ends fixed, uniform line load along the top edge
+def solve_plate(vertices, elements, E, nu, thickness, line_load):
+    return run_model(vertices, elements, {"E": E, "nu": nu}, {"thickness": thickness},
+                     supports=[{"where": 'ends', "dofs": [1, 1]}],
+                     loads=[{"type": 'line', "where": 'top', "qy": line_load}])
+
+
+# Function to return element areas from the corner nodes (shoelace formula), midside nodes are ignored
+def element_areas(vertices, elements):
+    corners = 4 if element_type_for(elements).startswith('quad') else 3
+    xy = vertices[elements[:, :corners], :2]
+    x = xy[:, :, 0]
+    y = xy[:, :, 1]
+    return 0.5 * np.abs(np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1))
+
+
+# Function to compute a Zienkiewicz-Zhu error indicator per element
+def zz_error(vertices, elements):
+    # Raw finite element stresses at the Gauss points, and the recovered (smoothed) nodal stresses sxx, syy, sxy
+    gauss = gauss_stresses(elements)
+    smooth = nodal_stresses(elements, gauss, len(vertices))
+
+    # The recovered field is interpolated to the Gauss points with the element shape functions and compared with
+    # the raw stresses there, Tri31 stresses are constant so they take the 3 point rule instead of the centroid
+    element_type = element_type_for(elements)
+    points, weights = QUADRATURE['tri6' if element_type == 'tri31' else element_type]
+    N, dN = shape_functions(element_type, points)
+    detJ, _ = jacobian(vertices, elements, dN)
+    recovered = np.einsum('gn,mnk->mgk', N, smooth[elements])
+    raw = np.broadcast_to(gauss, recovered.shape) if element_type == 'tri31' else gauss
+
+    # eta_e^2 = integral over the element of |sigma* - sigma_h|^2, ||sigma*||^2 over the whole mesh
+    dA = weights * detJ
+    eta_squared = np.sum(dA * np.sum((recovered - raw) ** 2, axis=2), axis=1)
+    norm_squared = np.sum(dA * np.sum(recovered ** 2, axis=2))
+
+    return np.sqrt(eta_squared), np.sqrt(norm_squared)
+
+
+# Function to compute new nodal target sizes that equidistribute the error
+def refined_sizes(vertices, elements, eta, norm, target_error, min_size, max_size):
+    element_type = element_type_for(elements)
+    areas = element_areas(vertices, elements)
+    h = np.sqrt(areas) if element_type.startswith('quad') else np.sqrt(2.0 * areas)
+
+    # Permissible error per element, then h_new = h * (allowed / eta)^(1/p), p = 1 for linear and 2 for quadratic
+    allowed = target_error * norm / np.sqrt(len(elements))
+    ratio = (allowed / np.maximum(eta, 1e-300)) ** (1.0 / ELEMENT_ORDER[element_type])
+    ratio = np.clip(ratio, MIN_SIZE_RATIO, MAX_SIZE_RATIO)
+    h_new = np.clip(h * ratio, min_size, max_size)
+
+    # Average element sizes onto the nodes
+    counts = np.bincount(elements.ravel(), minlength=len(vertices))
+    totals = np.bincount(elements.ravel(), weights=np.repeat(h_new, elements.shape[1]), minlength=len(vertices))
+    return totals / np.maximum(counts, 1)
+
+
+# Function to solve, estimate, re-mesh and repeat until the relative error target is met
+# order=2 refines quadratic meshes (tri6, or quad8 with recombine) with the h^2 error rate
+def run_adaptive(width, length, mesh_size, target_error=0.05, max_iterations=6, hole=False, recombine=True,
+                 E=30100.0, nu=0.2, thickness=350.0, line_load=-1500.0, min_size=None, order=1):
+    if min_size is None:
+        min_size = mesh_size / 20
+
+    background = None
+    history = []
+    result = None, None
+    for iteration in range(1, max_iterations + 1):
+        # A mesh that cannot be analysed (mixed element types, singular stiffness) ends the loop, refining from
+        # its stresses would only chase a wrong solution
+        try:
+            vertices, elements = mesh_plate(width, length, mesh_size, hole=hole, recombine=recombine,
+                                            background=background, order=order)
+            solve_plate(vertices, elements, E, nu, thickness, line_load)
+        except (ValueError, RuntimeError) as error:
+            print(f"Iteration {iteration} failed, stopping: {error}")
+            break
+        result = vertices, elements
+
+        eta, norm = zz_error(vertices, elements)
+        error = np.sqrt(np.sum(eta ** 2)) / norm
+        history.append({"iteration": iteration, "nodes": len(vertices), "elements": len(elements),
+                        "dofs": 2 * len(vertices), "error": error})
+        print(f"Iteration {iteration}: {len(elements)} elements, {2 * len(vertices)} DOFs, "
+              f"relative error {error:.4f}")
+
+        if error <= target_error:
+            break
+
+        # Once the sizes sit at min_size (eg. around the singular opening corners) re-meshing gives the same mesh
+        if len(history) > 1:
+            previous = history[-2]
+            if (abs(history[-1]["dofs"] - previous["dofs"]) <= STALL_TOLERANCE * previous["dofs"]
+                    and abs(error - previous["error"]) <= STALL_TOLERANCE * previous["error"]):
+                print(f"Refinement stalled at iteration {iteration}, stopping")
+                break
+
+        sizes = refined_sizes(vertices, elements, eta, norm, target_error, min_size, mesh_size)
+
+        # The size field is interpolated over the corner nodes, a linear view of the mesh
+        corners = 4 if elements.shape[1] in (4, 8, 9) else 3
+        background = (vertices, elements[:, :corners], sizes)
+
+    if history and history[-1]["error"] > target_error:
+        print(f"Target error {target_error} not reached, relative error {history[-1]['error']:.4f} after "
+              f"{len(history)} iterations")
+    return result[0], result[1], history
+
+
+if __name__ == '__main__':
+    # R.C wall example with a central opening
+    run_adaptive(8.0, 3.0, 0.5, target_error=0.05, hole=True)
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+
+# Render plots off-screen, batch jobs run on machines without a display
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import opsvis
+from matplotlib import pyplot as plt
+
+from load_cases import LoadCaseManager
+from model_builder import compare_linear_path, is_linear_elastic, load_mesh, print_linear_report, run_model, timed
+from results import averaging_matrix, collect_results, stress_invariants
+from sparse_backend import SparseModel
+
+# Keys a job may leave out
+DEFAULT_JOB = {
+    "section": {"type": 'PlaneStress'},
+    "supports": [{"where": 'ends', "dofs": [1, 1]}],
+    "analysis": None,
+    "plots": False,
+    "backend": 'opensees',  # 'sparse' solves elastic jobs with sparse_backend, without OpenSees
+}
+
+
+# Function to build the mesh a job asks for: {"file": ...} or plate dimensions and a mesher
+# Returns (vertices, elements, boundary_tags), the physical boundary groups of mesh files and gmsh meshes select the
+# "where" edges of supports and loads, the structured and triangle meshers have none (None)
+def make_mesh(spec):
+    if "file" in spec:
+        return load_mesh(spec["file"], boundary_tags=True)
+
+    width = spec["width"]
+    length = spec["length"]
+    mesh_size = spec["mesh_size"]
+    order = spec.get("order", 1)
+    mesher = spec.get("mesher", 'structured')
+
+    # Meshers are imported on demand, gmsh and meshpy are only needed by the jobs that use them
+    boundary_tags = None
+    if mesher == 'structured':
+        from structured_mesher import mesh_plate
+        vertices, elements = mesh_plate(width, length, mesh_size, element_type=spec.get("element_type", 'quad'),
+                                        order=order, lagrange=spec.get("lagrange", False))
+    elif mesher == 'gmsh':
+        from gmsh_mesher import mesh_plate
+        vertices, elements, boundary_tags = mesh_plate(width, length, mesh_size, hole=spec.get("hole", False),
+                                                       recombine=spec.get("element_type", 'quad') == 'quad',
+                                                       grading=spec.get("grading"), order=order,
+                                                       lagrange=spec.get("lagrange", False), boundary_tags=True)
+    elif mesher == 'triangle':
+        from tri_mesher import mesh_plate
+        vertices, elements = mesh_plate(width, length, mesh_size, order=order)
+    else:
+        raise ValueError(f"Unknown mesher: {mesher}")
+
+    return np.asarray(vertices)[:, :2], np.asarray(elements), boundary_tags
+
+
+# Function to read a job file, which holds one job or {"jobs": [...]}
+def read_jobs(filename):
+    with open(filename, 'r') as f:
+        spec = json.load(f)
+
+    jobs = spec["jobs"] if "jobs" in spec else [spec]
+    base = os.path.splitext(os.path.basename(filename))[0]
+    for i, job in enumerate(jobs, start=1):
+        job.setdefault("name", base if len(jobs) == 1 else f"{base}_{i}")
+    return jobs
+
+
+# Function to save the von Mises and deformed shape plots of the current analysis, sig_out = nodal stress table
+def save_plots(directory, case_name, sig_out):
+    plt.figure()
+    opsvis.plot_stress_2d(sig_out[:, 3])
+    plt.title(f"{case_name} vmis, Min: {sig_out[:, 3].min():.2f}, Max: {sig_out[:, 3].max():.2f}")
+    plt.savefig(os.path.join(directory, f"{case_name}_vmis.png"), dpi=150)
+    plt.close('all')
+
+    opsvis.plot_defo(unDefoFlag=1)
+    plt.axis('equal')
+    plt.savefig(os.path.join(directory, f"{case_name}_defo.png"), dpi=150)
+    plt.close('all')
+
+
+# Function to run one job, every load case and combination is written to <output>/<job name>/
+# compare_linear=True also times Newton against the Linear fast path for each load case
+def run_job(job, output, compare_linear=False):
+    job = {**DEFAULT_JOB, **job}
+    section = {**DEFAULT_JOB["section"], **job["section"]}
+    directory = os.path.join(output, job["name"])
+    os.makedirs(directory, exist_ok=True)
+
+    timings = {}
+    with timed(timings, "mesh"):
+        vertices, elements, boundary_tags = make_mesh(job["mesh"])
+
+    # Stress averaging matrix shared by every load case of the job
+    averaging = averaging_matrix(elements, len(vertices))
+
+    summary = {"name": job["name"], "nodes": len(vertices), "elements": len(elements),
+               "timings": timings, "load_cases": {}, "combinations": {}}
+
+    # Each comparison rebuilds the model, so they all run before the load cases
+    linear_paths = {}
+    if compare_linear:
+        for case in job["load_cases"]:
+            linear_paths[case["name"]] = compare_linear_path(vertices, elements, job["material"], section,
+                                                             job["supports"], case["loads"], job["analysis"],
+                                                             boundary_tags)
+            print_linear_report(linear_paths[case["name"]])
+
+    # Elastic models are factorized once and every load case is a back-substitution
+    manager = None
+    if job["backend"] == 'sparse':
+        with timed(timings, "build"):
+            manager = SparseModel(vertices, elements, job["material"], section, job["supports"], boundary_tags)
+        timings.update(manager.timings)
+    elif job["backend"] != 'opensees':
+        raise ValueError(f"Unknown backend: {job['backend']}")
+    elif is_linear_elastic(job["material"]):
+        with timed(timings, "build"):
+            manager = LoadCaseManager(vertices, elements, job["material"], section, job["supports"],
+                                      job["analysis"], boundary_tags)
+        timings.update(manager.timings)
+
+    # Stress components of every load case, combinations superpose them like the displacements
+    case_stresses = {}
+    for case in job["load_cases"]:
+        if manager is not None:
+            manager.solve(case["name"], case["loads"])
+            case_timings = manager.case_timings[case["name"]]
+        else:
+            case_timings = run_model(vertices, elements, job["material"], section, job["supports"], case["loads"],
+                                     job["analysis"], boundary_tags)
+
+        with timed(case_timings, "results"):
+            if job["backend"] == 'sparse':
+                results = {**manager.solutions[case["name"]], "stresses": manager.stress_table(case["name"])}
+            else:
+                results = collect_results(elements, len(vertices), averaging)
+            np.savez(os.path.join(directory, f"{case['name']}.npz"), vertices=vertices, elements=elements,
+                     **results)
+            case_stresses[case["name"]] = {key: results[key] for key in ("gauss_stresses",) if key in results}
+            case_stresses[case["name"]]["stresses"] = results["stresses"][:, :3]
+
+        # The plots are drawn by opsvis from the OpenSees domain
+        if job["plots"] and job["backend"] == 'opensees':
+            with timed(case_timings, "plots"):
+                save_plots(directory, case["name"], results["stresses"])
+
+        displacement = np.linalg.norm(results["displacements"], axis=1)
+        summary["load_cases"][case["name"]] = {
+            "max_displacement": float(displacement.max()),
+            "max_displacement_node": int(displacement.argmax()) + 1,
+            "reaction_sum": results["reactions"].sum(axis=0).tolist(),
+            "max_von_mises": float(results["stresses"][:, 3].max()),
+            "timings": case_timings,
+        }
+        if case["name"] in linear_paths:
+            summary["load_cases"][case["name"]]["linear_path"] = linear_paths[case["name"]]
+
+    # Combinations superpose the stored load case solutions, {"name": ..., "factors": {case: factor}}
+    for combination in job.get("combinations", []):
+        if manager is None:
+            raise ValueError("Load combinations need a linear elastic model.")
+
+        manager.combine(combination["name"], combination["factors"])
+        solution = dict(manager.solutions[combination["name"]])
+
+        # sxx, syy, sxy are linear in the load for an elastic model, von Mises and the principal stresses are not
+        # and are recomputed from the superposed components
+        for key in case_stresses[job["load_cases"][0]["name"]]:
+            solution[key] = sum(factor * case_stresses[name][key]
+                                for name, factor in combination["factors"].items())
+        solution["stresses"] = stress_invariants(solution["stresses"])
+        np.savez(os.path.join(directory, f"{combination['name']}.npz"), vertices=vertices, elements=elements,
+                 **solution)
+
+        displacement = np.linalg.norm(solution["displacements"], axis=1)
+        summary["combinations"][combination["name"]] = {
+            "factors": combination["factors"],
+            "max_displacement": float(displacement.max()),
+            "max_displacement_node": int(displacement.argmax()) + 1,
+            "reaction_sum": solution["reactions"].sum(axis=0).tolist(),
+            "max_von_mises": float(solution["stresses"][:, 3].max()),
+        }
+
+    with open(os.path.join(directory, "results.json"), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    return summary
+
+
+# Function to run every job in the given job files, failures are recorded and the batch carries on
+def run_batch(job_files, output, compare_linear=False):
+    os.makedirs(output, exist_ok=True)
+    failed = 0
+
+    with open(os.path.join(output, "summary.jsonl"), 'a') as log:
+        for filename in job_files:
+            for job in read_jobs(filename):
+                t0 = time.perf_counter()
+                try:
+                    summary = run_job(job, output, compare_linear=compare_linear)
+                    record = {"name": job["name"], "status": "ok", "job_file": filename,
+                              "load_cases": {name: {"max_displacement": case["max_displacement"],
+                                                    "max_von_mises": case["max_von_mises"]}
+                                             for name, case in summary["load_cases"].items()},
+                              "combinations": {name: {"max_displacement": combination["max_displacement"],
+                                                      "max_von_mises": combination["max_von_mises"]}
+                                               for name, combination in summary["combinations"].items()}}
+                except Exception:
+                    failed += 1
+                    record = {"name": job["name"], "status": "failed", "job_file": filename,
+                              "error": traceback.format_exc()}
+
+                record["seconds"] = time.perf_counter() - t0
+                log.write(json.dumps(record) + "\n")
+                log.flush()
+                print(f"{record['name']}: {record['status']} ({record['seconds']:.2f} s)")
+
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run plane-stress analysis jobs from JSON job files.")
+    parser.add_argument("job_files", nargs='+', help="JSON job files")
+    parser.add_argument("-o", "--output", default="batch_results", help="output directory")
+    parser.add_argument("--compare-linear", action='store_true',
+                        help="also solve with Newton iterations and report the time the Linear fast path saves")
+    args = parser.parse_args(argv)
+
+    failed = run_batch(args.job_files, args.output, compare_linear=args.compare_linear)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
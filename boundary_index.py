@@ -0,0 +1,134 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from mesh_io import BOUNDARY_GROUPS
+
+
+# Function to return the boundary (free) edges of a mesh: edges used by a single element
+# Returns corner pairs (k, 2) in the element's node order, the midside node of each edge (k,) (-1 for linear
+# elements) and the element each edge belongs to (k,)
+def free_edges(elements):
+    elements = np.asarray(elements)
+    n_corners = 3 if elements.shape[1] in (3, 6) else 4
+
+    # Edge k runs from corner k to corner k + 1, its midside node (if any) is column n_corners + k
+    corners = elements[:, :n_corners]
+    pairs = np.stack([corners, np.roll(corners, -1, axis=1)], axis=2).reshape(-1, 2)
+    if elements.shape[1] > n_corners:
+        midside = elements[:, n_corners:2 * n_corners].ravel()
+    else:
+        midside = np.full(len(pairs), -1, dtype=elements.dtype)
+
+    # One integer key per undirected edge, a 1D unique is much faster than unique rows
+    sorted_pairs = np.sort(pairs, axis=1).astype(np.int64)
+    keys = sorted_pairs[:, 0] * (int(elements.max()) + 1) + sorted_pairs[:, 1]
+    _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    boundary = first[counts == 1]
+    return pairs[boundary], midside[boundary], boundary // n_corners
+
+
+# Function to pack named node sets into the per-node bit mask stored as boundary_tags in mesh files
+def pack_boundary_tags(n_nodes, node_sets):
+    tags = np.zeros(n_nodes, dtype=np.int32)
+    for bit, name in enumerate(BOUNDARY_GROUPS):
+        if name in node_sets:
+            tags[node_sets[name]] |= 1 << bit
+    return tags
+
+
+# Boundary node sets built once from the mesh topology, queries return stored arrays instead of scanning the mesh
+#   boundary_tags: per-node bit mask of the physical groups in mesh_io.BOUNDARY_GROUPS (from gmsh or a mesh file),
+#                  groups without tagged nodes are found from the free edges and the outer bounding box
+class BoundaryIndex:
+    def __init__(self, vertices, elements, boundary_tags=None, tol=1e-6):
+        self.vertices = np.asarray(vertices, dtype=np.float64)[:, :2]
+        self.edges, self.midside, self.owners = free_edges(elements)
+        self._tree = None
+
+        # Nodes on the boundary, midside nodes included
+        edge_nodes = np.concatenate([self.edges.ravel(), self.midside[self.midside >= 0]])
+        self.nodes = np.unique(edge_nodes)
+
+        # Boundary loops: the outer loop holds the leftmost node, every other loop is an opening
+        n_nodes = len(self.vertices)
+        graph = coo_matrix((np.ones(len(self.edges)), (self.edges[:, 0], self.edges[:, 1])),
+                           shape=(n_nodes, n_nodes))
+        _, loops = connected_components(graph, directed=False)
+        corner_nodes = np.unique(self.edges)
+        outer_loop = loops[corner_nodes[np.argmin(self.vertices[corner_nodes, 0])]]
+        on_outer = np.zeros(n_nodes, dtype=bool)
+        on_outer[corner_nodes[loops[corner_nodes] == outer_loop]] = True
+
+        # Midside nodes belong to the loop of their edge
+        has_midside = self.midside >= 0
+        on_outer[self.midside[has_midside]] = on_outer[self.edges[has_midside, 0]]
+        outer = self.nodes[on_outer[self.nodes]]
+
+        x = self.vertices[outer, 0]
+        y = self.vertices[outer, 1]
+        tol = tol * max(np.ptp(self.vertices[:, 0]), np.ptp(self.vertices[:, 1]))
+        self.sets = {
+            "left": outer[np.abs(x - x.min()) <= tol],
+            "right": outer[np.abs(x - x.max()) <= tol],
+            "bottom": outer[np.abs(y - y.min()) <= tol],
+            "top": outer[np.abs(y - y.max()) <= tol],
+            "opening": self.nodes[~on_outer[self.nodes]],
+        }
+
+        # Physical groups read from the mesh replace the geometric guess
+        if boundary_tags is not None:
+            boundary_tags = np.asarray(boundary_tags)
+            for bit, name in enumerate(BOUNDARY_GROUPS):
+                tagged = np.flatnonzero(boundary_tags & (1 << bit))
+                if len(tagged):
+                    self.sets[name] = tagged
+
+        self.sets["ends"] = np.union1d(self.sets["left"], self.sets["right"])
+        self.sets["boundary"] = self.nodes
+        self.sets["all"] = np.arange(n_nodes)
+
+    # Function to return the boundary group bit mask of every node, as stored in mesh files
+    def boundary_tags(self):
+        return pack_boundary_tags(len(self.vertices), self.sets)
+
+    # KD-tree over all nodes, built on the first point query
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = cKDTree(self.vertices)
+        return self._tree
+
+    # Function to select 0-based node ids:
+    #   a set name ('left', 'right', 'bottom', 'top', 'ends', 'opening', 'boundary', 'all')
+    #   a list of 1-based node tags
+    #   {"near": [x, y]}                    the node closest to a point
+    #   {"near": [x, y], "radius": r}       every node within r of a point
+    #   {"line": [[x0, y0], [x1, y1]], "tol": t}  boundary nodes within t of a segment
+    def select(self, where):
+        if isinstance(where, str):
+            if where not in self.sets:
+                raise ValueError(f"Unknown node selection: {where}")
+            return self.sets[where]
+
+        if isinstance(where, dict):
+            if "near" in where:
+                if "radius" in where:
+                    return np.sort(np.asarray(self.tree.query_ball_point(where["near"], where["radius"]),
+                                              dtype=np.int64))
+                return np.array([self.tree.query(where["near"])[1]], dtype=np.int64)
+            if "line" in where:
+                return self.near_segment(*where["line"], tol=where.get("tol", 1e-6))
+            raise ValueError(f"Unknown node selection: {where}")
+
+        return np.asarray(where, dtype=np.int64) - 1
+
+    # Function to return the boundary nodes within tol of the segment p0-p1
+    def near_segment(self, p0, p1, tol=1e-6):
+        p0 = np.asarray(p0, dtype=np.float64)
+        direction = np.asarray(p1, dtype=np.float64) - p0
+        xy = self.vertices[self.nodes] - p0
+        t = np.clip(xy @ direction / max(direction @ direction, 1e-300), 0.0, 1.0)
+        distance = np.linalg.norm(xy - t[:, None] * direction, axis=1)
+        return self.nodes[distance <= tol]
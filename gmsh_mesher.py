@@ -0,0 +1,248 @@
+import gmsh
+import meshio
+import numpy as np
+
+from gmsh_session import get_session
+from mesh_io import BOUNDARY_GROUPS, MESHIO_CELLS, element_type_for
+
+# Gmsh element type codes for the 2D elements used by the analysis scripts
+GMSH_TRIANGLE = 2
+GMSH_QUAD = 3
+GMSH_TRIANGLE6 = 9
+GMSH_QUAD9 = 10
+GMSH_QUAD8 = 16
+
+# Nodes per element for each gmsh element type, quadrilaterals first so they are preferred
+GMSH_NODES = {GMSH_QUAD9: 9, GMSH_QUAD8: 8, GMSH_QUAD: 4, GMSH_TRIANGLE6: 6, GMSH_TRIANGLE: 3}
+
+
+# Function to build the plate geometry directly in the gmsh model (no .geo file)
+def build_plate_geometry(width, length, mesh_size, hole=False, inner_width=1.0, inner_length=1.0):
+    geo = gmsh.model.geo
+
+    # Outer boundary of the plate
+    p1 = geo.addPoint(0, 0, 0, mesh_size)
+    p2 = geo.addPoint(width, 0, 0, mesh_size)
+    p3 = geo.addPoint(width, length, 0, mesh_size)
+    p4 = geo.addPoint(0, length, 0, mesh_size)
+
+    l1 = geo.addLine(p1, p2)
+    l2 = geo.addLine(p2, p3)
+    l3 = geo.addLine(p3, p4)
+    l4 = geo.addLine(p4, p1)
+
+    loops = [geo.addCurveLoop([l1, l2, l3, l4])]
+
+    # Named boundary entities, used for size fields
+    entities = {"bottom": [l1], "right": [l2], "top": [l3], "left": [l4], "opening": [], "opening_corners": []}
+
+    # Central opening, cut out of the plate surface
+    if hole:
+        x0 = (width - inner_width) / 2
+        x1 = (width + inner_width) / 2
+        y0 = (length - inner_length) / 2
+        y1 = (length + inner_length) / 2
+
+        p5 = geo.addPoint(x0, y0, 0, mesh_size)
+        p6 = geo.addPoint(x1, y0, 0, mesh_size)
+        p7 = geo.addPoint(x1, y1, 0, mesh_size)
+        p8 = geo.addPoint(x0, y1, 0, mesh_size)
+
+        l5 = geo.addLine(p5, p6)
+        l6 = geo.addLine(p6, p7)
+        l7 = geo.addLine(p7, p8)
+        l8 = geo.addLine(p8, p5)
+
+        loops.append(geo.addCurveLoop([l5, l6, l7, l8]))
+        entities["opening"] = [l5, l6, l7, l8]
+        entities["opening_corners"] = [p5, p6, p7, p8]
+
+    surface = geo.addPlaneSurface(loops)
+    geo.synchronize()
+
+    # Physical curves carry the edge names into the mesh, tag k + 1 for BOUNDARY_GROUPS[k]
+    for tag, name in enumerate(BOUNDARY_GROUPS, start=1):
+        if entities[name]:
+            gmsh.model.addPhysicalGroup(1, entities[name], tag, name=name)
+    gmsh.model.addPhysicalGroup(2, [surface], name="plate")
+
+    return surface, entities
+
+
+# Function to pull the mesh out of the gmsh model as NumPy arrays
+def extract_mesh_arrays():
+    node_tags, coords, _ = gmsh.model.mesh.getNodes()
+    vertices = coords.reshape(-1, 3)
+
+    # Gmsh node tags are not guaranteed to be contiguous, so map them to row indices
+    order = np.argsort(node_tags)
+    sorted_tags = node_tags[order]
+    vertices = vertices[order]
+
+    element_types, _, element_nodes = gmsh.model.mesh.getElements(dim=2)
+    blocks = {element_type: nodes for element_type, nodes in zip(element_types, element_nodes)
+              if element_type in GMSH_NODES}
+    if not blocks:
+        raise ValueError("No quadrilateral or triangular cells found in the mesh.")
+
+    # The analysis uses one element type per mesh, dropping a block would leave orphan nodes
+    if len(blocks) > 1:
+        counts = {int(element_type): len(nodes) // GMSH_NODES[element_type] for element_type, nodes in blocks.items()}
+        raise ValueError(f"Mixed element types in the mesh (gmsh type: count) {counts}.")
+
+    element_type, nodes = next(iter(blocks.items()))
+    connectivity = nodes.reshape(-1, GMSH_NODES[element_type])
+
+    elements = np.searchsorted(sorted_tags, connectivity)
+
+    return vertices, elements, sorted_tags
+
+
+# Function to read the nodes of the physical boundary curves into a boundary_tags bit mask
+def extract_boundary_tags(sorted_tags):
+    boundary_tags = np.zeros(len(sorted_tags), dtype=np.int32)
+    for dim, tag in gmsh.model.getPhysicalGroups(dim=1):
+        name = gmsh.model.getPhysicalName(dim, tag)
+        if name in BOUNDARY_GROUPS:
+            node_tags, _ = gmsh.model.mesh.getNodesForPhysicalGroup(dim, tag)
+            boundary_tags[np.searchsorted(sorted_tags, node_tags)] |= 1 << BOUNDARY_GROUPS.index(name)
+    return boundary_tags
+
+
+# Function to add a PostView size field from nodal target sizes on a previous mesh
+def background_size_field(vertices, elements, sizes):
+    vertices = np.asarray(vertices)
+    elements = np.asarray(elements)
+    if vertices.shape[1] == 2:
+        vertices = np.column_stack([vertices, np.zeros(len(vertices))])
+
+    # List-based view data per element: all x, then all y, then all z, then the nodal values
+    coords = vertices[elements]
+    data = np.concatenate(
+        [coords[:, :, 0], coords[:, :, 1], coords[:, :, 2], np.asarray(sizes)[elements]], axis=1)
+
+    view = gmsh.view.add("background sizes")
+    gmsh.view.addListData(view, "SQ" if elements.shape[1] == 4 else "ST", len(elements), data.ravel().tolist())
+
+    field = gmsh.model.mesh.field.add("PostView")
+    gmsh.model.mesh.field.setNumber(field, "ViewTag", view)
+    return field
+
+
+# Function to add Distance/Threshold fields that grade the mesh towards the hotspots
+def grading_size_fields(entities, mesh_size, grading):
+    fine_size = grading.get("fine_size") or mesh_size / 4
+    distance = grading.get("distance") or 4 * mesh_size
+
+    # (points, curves) to refine towards: opening corners, fixed (left/right) edges, loaded (top) edge
+    targets = []
+    if grading.get("opening", True) and entities["opening_corners"]:
+        targets.append((entities["opening_corners"], []))
+    if grading.get("fixed_edges", True):
+        targets.append(([], entities["left"] + entities["right"]))
+    if grading.get("loaded_edges", True):
+        targets.append(([], entities["top"]))
+
+    fields = []
+    for points, curves in targets:
+        distance_field = gmsh.model.mesh.field.add("Distance")
+        if points:
+            gmsh.model.mesh.field.setNumbers(distance_field, "PointsList", points)
+        if curves:
+            gmsh.model.mesh.field.setNumbers(distance_field, "CurvesList", curves)
+            gmsh.model.mesh.field.setNumber(distance_field, "Sampling", 100)
+
+        # fine_size at the target, growing linearly to mesh_size over the transition distance
+        threshold = gmsh.model.mesh.field.add("Threshold")
+        gmsh.model.mesh.field.setNumber(threshold, "InField", distance_field)
+        gmsh.model.mesh.field.setNumber(threshold, "SizeMin", fine_size)
+        gmsh.model.mesh.field.setNumber(threshold, "SizeMax", mesh_size)
+        gmsh.model.mesh.field.setNumber(threshold, "DistMin", 0.0)
+        gmsh.model.mesh.field.setNumber(threshold, "DistMax", distance)
+        fields.append(threshold)
+
+    return fields
+
+
+# Function to mesh a rectangular plate and return (vertices, elements) arrays
+# order=2 gives quadratic elements: 6-node triangles, 8-node quads, or 9-node quads with lagrange=True
+# boundary_tags=True also returns the physical boundary group bit mask of every node
+def mesh_plate(width, length, mesh_size, hole=False, recombine=True, background=None, grading=None, order=1,
+               lagrange=False, boundary_tags=False):
+    with get_session().request("plate"):
+        gmsh.model.add("plate")
+
+        surface, entities = build_plate_geometry(width, length, mesh_size, hole=hole)
+
+        gmsh.option.setNumber("Mesh.Algorithm", 8)
+
+        fields = []
+        if grading is not None:
+            fields.extend(grading_size_fields(entities, mesh_size, grading))
+        if background is not None:
+            # background = (vertices, elements, nodal sizes) from a previous mesh
+            fields.append(background_size_field(*background))
+
+        if fields:
+            # The smallest requested size wins, and only the fields control the element size
+            size_field = gmsh.model.mesh.field.add("Min")
+            gmsh.model.mesh.field.setNumbers(size_field, "FieldsList", fields)
+            gmsh.model.mesh.field.setAsBackgroundMesh(size_field)
+
+            gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", 0)
+            gmsh.option.setNumber("Mesh.MeshSizeFromPoints", 0)
+            gmsh.option.setNumber("Mesh.MeshSizeFromCurvature", 0)
+
+            if recombine:
+                # Recombination leaves triangles where graded sizes change quickly, subdivide everything into
+                # quads instead, at twice the requested size so the subdivided elements end up at that size
+                gmsh.option.setNumber("Mesh.RecombineAll", 1)
+                gmsh.option.setNumber("Mesh.SubdivisionAlgorithm", 1)
+                gmsh.option.setNumber("Mesh.MeshSizeFactor", 2.0)
+        else:
+            gmsh.option.setNumber("Mesh.CharacteristicLengthMin", mesh_size)
+
+        if recombine:
+            gmsh.model.mesh.setRecombine(2, surface)
+
+        gmsh.model.mesh.generate(2)
+
+        if order == 2:
+            # Incomplete (serendipity) second order drops the quad centre node
+            gmsh.option.setNumber("Mesh.SecondOrderIncomplete", 0 if lagrange else 1)
+            gmsh.model.mesh.setOrder(2)
+
+        vertices, elements, sorted_tags = extract_mesh_arrays()
+        if boundary_tags:
+            return vertices, elements, extract_boundary_tags(sorted_tags)
+        return vertices, elements
+
+
+# Function to write mesh arrays to a .msh file (only called on explicit export)
+# boundary = BoundaryIndex of the mesh, its edge groups are written as named physical curves
+def write_msh(filename, vertices, elements, boundary=None):
+    cell_type = MESHIO_CELLS[element_type_for(elements)]
+    cells = [(cell_type, elements)]
+    physical = [np.zeros(len(elements), dtype=int)]
+    field_data = {}
+
+    if boundary is not None:
+        quadratic = np.all(boundary.midside >= 0)
+        for tag, name in enumerate(BOUNDARY_GROUPS, start=1):
+            on_group = np.isin(boundary.edges, boundary.sets[name]).all(axis=1)
+            if not on_group.any():
+                continue
+            lines = boundary.edges[on_group]
+            if quadratic:
+                lines = np.column_stack([lines, boundary.midside[on_group]])
+            cells.append(('line3' if quadratic else 'line', lines))
+            physical.append(np.full(len(lines), tag))
+            field_data[name] = np.array([tag, 1])
+
+    mesh = meshio.Mesh(
+        vertices,
+        cells,
+        cell_data={"gmsh:physical": physical, "gmsh:geometrical": physical},
+        field_data=field_data,
+    )
+    meshio.write(filename, mesh, file_format='gmsh22', binary=False)
@@ -0,0 +1,91 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+import gmsh
+
+
+# Long-lived gmsh context shared by the GUIs, cleared between mesh requests
+class GmshSession:
+    def __init__(self):
+        self.started = False
+        self.lock = threading.RLock()
+
+        # Cost of the initialize() call the session paid once, measured on start
+        self.startup_time = 0.0
+
+        # Per-session statistics
+        self.request_count = 0
+        self.total_saved = 0.0
+        self.last_report = None
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+
+            # gmsh can only install its interrupt handler from the main thread
+            interruptible = threading.current_thread() is threading.main_thread()
+
+            # Time the one startup this session pays, every later request skips it
+            t0 = time.perf_counter()
+            gmsh.initialize(interruptible=interruptible)
+            self.startup_time = time.perf_counter() - t0
+
+            gmsh.option.setNumber("General.Terminal", 0)
+            self.started = True
+
+            print(f"gmsh session started (initialize {self.startup_time * 1000:.1f} ms)")
+
+    def close(self):
+        with self.lock:
+            if self.started:
+                gmsh.finalize()
+                self.started = False
+
+    @contextmanager
+    def request(self, name="mesh"):
+        # Serialise access, gmsh keeps a single global model state
+        with self.lock:
+            # The request that starts the session pays the startup itself, so it saves nothing
+            warm = self.started
+            self.start()
+            gmsh.clear()
+
+            # Options outlive gmsh.clear(), reset them so one request cannot leak into the next
+            gmsh.option.restoreDefaults()
+            gmsh.option.setNumber("General.Terminal", 0)
+
+            t0 = time.perf_counter()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - t0
+                saved = self.startup_time if warm else 0.0
+                self.request_count += 1
+                self.total_saved += saved
+                self.last_report = {
+                    "name": name,
+                    "elapsed": elapsed,
+                    "saved": saved,
+                    "total_saved": self.total_saved,
+                    "requests": self.request_count,
+                }
+
+                # Only the measured initialize() is counted, the finalize() a cold request also paid is not timed
+                print(f"gmsh {name} request took {elapsed * 1000:.1f} ms, "
+                      f"skipped {saved * 1000:.1f} ms of startup "
+                      f"({self.total_saved * 1000:.1f} ms over {self.request_count} requests)")
+
+
+_session = None
+
+
+# Function to get the process-wide gmsh session (main.py, quad_mesh.py, vtk_render.py)
+def get_session():
+    global _session
+    if _session is None:
+        _session = GmshSession()
+        atexit.register(_session.close)
+    return _session
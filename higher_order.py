@@ -0,0 +1,35 @@
+import numpy as np
+
+
+# Function to return the unique edges of a linear mesh and, per element, the index of each of its edges
+def element_edges(elements):
+    elements = np.asarray(elements)
+    n_elements, n_corners = elements.shape
+
+    # Edge k runs from corner k to corner k + 1, the same order gmsh and OpenSees number midside nodes
+    pairs = np.stack([elements, np.roll(elements, -1, axis=1)], axis=2).reshape(-1, 2)
+    edges, inverse = np.unique(np.sort(pairs, axis=1), axis=0, return_inverse=True)
+
+    return edges, inverse.reshape(n_elements, n_corners)
+
+
+# Function to add midside (and centre) nodes to a tri3/quad4 mesh, corner node ids are unchanged
+def elevate_order(vertices, elements, lagrange=False):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    elements = np.asarray(elements)
+    n_nodes = len(vertices)
+
+    # One midside node per unique edge, shared by the elements on either side
+    edges, edge_index = element_edges(elements)
+    midside = 0.5 * (vertices[edges[:, 0]] + vertices[edges[:, 1]])
+
+    new_vertices = [vertices, midside]
+    new_elements = [elements, n_nodes + edge_index]
+
+    # 9-node quads also carry a node at the element centre
+    if lagrange and elements.shape[1] == 4:
+        new_vertices.append(vertices[elements].mean(axis=1))
+        new_elements.append((n_nodes + len(edges) + np.arange(len(elements)))[:, None])
+
+    return np.concatenate(new_vertices), np.concatenate(new_elements, axis=1)
+
@@ -0,0 +1,126 @@
+import numpy as np
+
+from mesh_io import NODES_PER_ELEMENT
+
+GAUSS = 1.0 / np.sqrt(3.0)
+GAUSS3 = np.sqrt(0.6)
+
+# Natural coordinates of the quadrilateral nodes: corners counter-clockwise from the bottom-left, midside nodes
+# of edges 0-1, 1-2, 2-3, 3-0, centre node
+QUAD_NODES = np.array([[-1.0, -1.0], [1.0, -1.0], [1.0, 1.0], [-1.0, 1.0],
+                       [0.0, -1.0], [1.0, 0.0], [0.0, 1.0], [-1.0, 0.0], [0.0, 0.0]])
+
+# Natural coordinates (xi, eta) of the triangle nodes: corners, midside nodes of edges 0-1, 1-2, 2-0
+TRI_NODES = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [0.5, 0.0], [0.5, 0.5], [0.0, 0.5]])
+
+
+# Gauss weights of the 3 x 3 rule at each quad9 node position (5/9 at +-sqrt(0.6), 8/9 at 0)
+_WEIGHTS3 = np.where(QUAD_NODES == 0.0, 8.0 / 9.0, 5.0 / 9.0).prod(axis=1)
+
+# Quadrature points (xi, eta) and weights per element type, the rules and point order OpenSees uses for each
+# element: Tri31 1 point, quad 2 x 2 Gauss (counter-clockwise), tri6n 3 points, quad8n/quad9n 3 x 3 Gauss
+# numbered like the quad9 nodes (corners, midsides, centre)
+QUADRATURE = {
+    'tri31': (np.array([[1.0 / 3.0, 1.0 / 3.0]]), np.array([0.5])),
+    'quad4': (QUAD_NODES[:4] * GAUSS, np.ones(4)),
+    'tri6': (np.array([[1.0 / 6.0, 1.0 / 6.0], [2.0 / 3.0, 1.0 / 6.0], [1.0 / 6.0, 2.0 / 3.0]]), np.full(3, 1.0 / 6.0)),
+    'quad8': (QUAD_NODES * GAUSS3, _WEIGHTS3),
+    'quad9': (QUAD_NODES * GAUSS3, _WEIGHTS3),
+}
+
+# Lower order field fitted through the quadrature points to extrapolate them to the element nodes, with the scale
+# mapping the quadrature points onto that field's nodes
+EXTRAPOLATION_FIELDS = {'quad4': ('quad4', GAUSS), 'tri6': ('tri31', 1.0), 'quad8': ('quad9', GAUSS3),
+                        'quad9': ('quad9', GAUSS3)}
+
+
+# Function to evaluate the 1D quadratic Lagrange polynomials through -1, 0, 1 at the given node positions
+def _lagrange_1d(x, node):
+    value = np.where(node < 0, x * (x - 1) / 2, np.where(node > 0, x * (x + 1) / 2, 1 - x ** 2))
+    slope = np.where(node < 0, x - 0.5, np.where(node > 0, x + 0.5, -2 * x))
+    return value, slope
+
+
+# Function to return the shape functions (g, n) and their natural derivatives (g, 2, n) at the given points
+def shape_functions(element_type, points):
+    points = np.asarray(points, dtype=np.float64)
+    xi = points[:, 0, None]
+    eta = points[:, 1, None]
+
+    if element_type in ('tri31', 'tri6'):
+        # Area coordinates and their derivatives with respect to xi and eta
+        L = np.stack([1.0 - xi[:, 0] - eta[:, 0], xi[:, 0], eta[:, 0]], axis=1)
+        dL = np.array([[-1.0, 1.0, 0.0], [-1.0, 0.0, 1.0]])
+        if element_type == 'tri31':
+            return L, np.broadcast_to(dL, (len(points), 2, 3)).copy()
+
+        i, j = np.array([0, 1, 2]), np.array([1, 2, 0])
+        N = np.concatenate([L * (2 * L - 1), 4 * L[:, i] * L[:, j]], axis=1)
+        dN = np.concatenate([(4 * L - 1)[:, None, :] * dL,
+                             4 * (dL[:, i] * L[:, None, j] + L[:, None, i] * dL[:, j])], axis=2)
+        return N, dN
+
+    if element_type == 'quad4':
+        a = xi * QUAD_NODES[:4, 0]
+        b = eta * QUAD_NODES[:4, 1]
+        N = 0.25 * (1.0 + a) * (1.0 + b)
+        dN = 0.25 * np.stack([QUAD_NODES[:4, 0] * (1.0 + b), QUAD_NODES[:4, 1] * (1.0 + a)], axis=1)
+        return N, dN
+
+    if element_type == 'quad8':
+        xi_i, eta_i = QUAD_NODES[:4, 0], QUAD_NODES[:4, 1]
+        a = xi * xi_i
+        b = eta * eta_i
+        corners = 0.25 * (1 + a) * (1 + b) * (a + b - 1)
+        corners_xi = 0.25 * xi_i * (1 + b) * (2 * a + b)
+        corners_eta = 0.25 * eta_i * (1 + a) * (a + 2 * b)
+
+        # Midside nodes 4, 6 lie on eta = -1, 1 and nodes 5, 7 on xi = 1, -1
+        eta_m = QUAD_NODES[[4, 6], 1]
+        xi_m = QUAD_NODES[[5, 7], 0]
+        bottom_top = 0.5 * (1 - xi ** 2) * (1 + eta * eta_m)
+        bottom_top_xi = -xi * (1 + eta * eta_m)
+        bottom_top_eta = 0.5 * eta_m * (1 - xi ** 2)
+        right_left = 0.5 * (1 + xi * xi_m) * (1 - eta ** 2)
+        right_left_xi = 0.5 * xi_m * (1 - eta ** 2)
+        right_left_eta = -eta * (1 + xi * xi_m)
+
+        order = [0, 1, 2, 3, 4, 6, 5, 7]
+        N = np.concatenate([corners, bottom_top, right_left], axis=1)[:, np.argsort(order)]
+        dN_xi = np.concatenate([corners_xi, bottom_top_xi, right_left_xi], axis=1)[:, np.argsort(order)]
+        dN_eta = np.concatenate([corners_eta, bottom_top_eta, right_left_eta], axis=1)[:, np.argsort(order)]
+        return N, np.stack([dN_xi, dN_eta], axis=1)
+
+    if element_type == 'quad9':
+        lx, dlx = _lagrange_1d(xi, QUAD_NODES[:, 0])
+        ly, dly = _lagrange_1d(eta, QUAD_NODES[:, 1])
+        return lx * ly, np.stack([dlx * ly, lx * dly], axis=1)
+
+    raise ValueError(f"Unsupported element type: {element_type}")
+
+
+# Function to map the shape function derivatives of every element to physical coordinates
+# Returns det(J) (m, g) and dN/dx, dN/dy (m, g, 2, n)
+def jacobian(vertices, elements, dN):
+    # J[a, b] = d x_b / d xi_a for every element and quadrature point
+    xy = np.asarray(vertices)[elements][:, :, :2]
+    J = np.einsum('gan,mnb->mgab', dN, xy)
+    detJ = np.linalg.det(J)
+    if np.any(detJ <= 0):
+        raise ValueError(f"{np.count_nonzero((detJ <= 0).any(axis=1))} elements are inverted or degenerate.")
+
+    return detJ, np.einsum('mgab,gbn->mgan', np.linalg.inv(J), dN)
+
+
+# Function to return the matrix (n, g) extrapolating quadrature point values to the element nodes, the same
+# recovery OpenSees uses for the 'stressAtNodes' response
+def extrapolation_matrix(element_type):
+    points, _ = QUADRATURE[element_type]
+    if element_type == 'tri31':
+        return np.ones((3, 1))
+
+    nodes = (QUAD_NODES if element_type.startswith('quad') else TRI_NODES)[:NODES_PER_ELEMENT[element_type]]
+    field, scale = EXTRAPOLATION_FIELDS[element_type]
+    at_points, _ = shape_functions(field, points / scale)
+    at_nodes, _ = shape_functions(field, nodes / scale)
+    return at_nodes @ np.linalg.inv(at_points)
@@ -0,0 +1,94 @@
+import numpy as np
+import openseespy.opensees as ops
+
+from boundary_index import BoundaryIndex
+from model_builder import (DEFAULT_ANALYSIS, add_load_pattern, apply_supports, build_domain, check_linear_solution,
+                           is_linear_elastic, load_vector, setup_analysis, timed)
+from results import node_results
+from solver_select import select_solver
+
+
+# Function to superpose solved load cases, solutions = {name: {"displacements", "reactions"}}
+def superpose(solutions, factors):
+    missing = set(factors) - set(solutions)
+    if missing:
+        raise KeyError(f"Load cases not solved: {', '.join(sorted(missing))}")
+
+    return {
+        key: sum(factor * solutions[case][key] for case, factor in factors.items())
+        for key in ("displacements", "reactions")
+    }
+
+
+# Elastic model kept in the OpenSees domain, the stiffness is factorized on the first load case only and every
+# later load case is a back-substitution, load combinations superpose the stored solutions
+class LoadCaseManager:
+    def __init__(self, vertices, elements, material, section, supports=(), analysis=None, boundary_tags=None):
+        if not is_linear_elastic(material):
+            raise ValueError("Load cases can only be superposed for linear elastic models.")
+
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.elements = np.asarray(elements)
+        self.thickness = section["thickness"]
+        self.timings = {}
+
+        # Solved load cases and combinations: name -> {"displacements", "reactions"}
+        self.solutions = {}
+        self.case_timings = {}
+        self.pattern_tag = 0
+
+        with timed(self.timings, "boundary_index"):
+            self.index = BoundaryIndex(self.vertices, self.elements, boundary_tags)
+
+        build_domain(self.vertices, self.elements, material, section, self.timings)
+        apply_supports(self.vertices, supports, self.timings, self.index)
+
+        analysis = {**DEFAULT_ANALYSIS, **(analysis or {})}
+        if analysis["system"] == 'auto':
+            with timed(self.timings, "solver_selection"):
+                analysis["system"] = select_solver(self.vertices, self.elements)["system"]
+        setup_analysis({**analysis, "algorithm": 'Linear', "integrator": ['LoadControl', 1]}, self.timings)
+
+        # Keep the first factorization, the stiffness does not change between load cases
+        ops.algorithm('Linear', '-factorOnce')
+
+    # Function to solve one load case, returns its nodal displacements (N, 2)
+    def solve(self, name, loads):
+        timings = {}
+        with timed(timings, "loads"):
+            if self.pattern_tag:
+                ops.remove('loadPattern', self.pattern_tag)
+            self.pattern_tag += 1
+
+            # A Constant series applies the full load whatever the pseudo-time the previous cases advanced to
+            forces = load_vector(self.vertices, loads, self.elements, self.thickness, self.index)
+            add_load_pattern(forces, self.pattern_tag, series='Constant')
+
+        # For a linear model one Linear step lands on K^-1 P, whatever displacements the previous case left
+        with timed(timings, "solve"):
+            if ops.analyze(1) != 0:
+                raise RuntimeError(f"Load case {name} failed to solve.")
+
+        with timed(timings, "results"):
+            displacements, reactions = node_results(len(self.vertices))
+            check_linear_solution(displacements, reactions)
+            self.solutions[name] = {"displacements": displacements, "reactions": reactions}
+
+        self.case_timings[name] = timings
+        return self.solutions[name]["displacements"]
+
+    # Function to solve several load cases, load_cases = [{"name": ..., "loads": [...]}, ...]
+    def solve_all(self, load_cases):
+        for case in load_cases:
+            self.solve(case["name"], case["loads"])
+        return self.solutions
+
+    # Function to superpose solved load cases, factors = {case name: factor}, no re-solve
+    def combine(self, name, factors):
+        self.solutions[name] = superpose(self.solutions, factors)
+        return self.solutions[name]["displacements"]
+
+    # Function to print how long the first (factorizing) and later (back-substitution) solves took
+    def print_report(self):
+        for name, timings in self.case_timings.items():
+            print(f"  {name}: solve {timings['solve'] * 1000:.1f} ms, loads {timings['loads'] * 1000:.1f} ms")
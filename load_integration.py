@@ -0,0 +1,76 @@
+import numpy as np
+
+from isoparametric import QUADRATURE, jacobian, shape_functions
+from mesh_io import element_type_for
+
+
+# Function to add per-node forces (k, 2) at node ids (k,) into an (n_nodes, 2) array in one pass per direction
+def scatter_forces(n_nodes, nodes, forces):
+    return np.column_stack([np.bincount(nodes, weights=forces[:, 0], minlength=n_nodes),
+                            np.bincount(nodes, weights=forces[:, 1], minlength=n_nodes)])
+
+
+# Function to return the outward unit normal (k, 2) and the length (k,) of boundary edges
+def edge_normals(vertices, elements, edges, owners):
+    a = vertices[edges[:, 0]]
+    b = vertices[edges[:, 1]]
+    lengths = np.linalg.norm(b - a, axis=1)
+    normals = np.column_stack([b[:, 1] - a[:, 1], a[:, 0] - b[:, 0]]) / lengths[:, None]
+
+    # Point away from the element the edge belongs to, whatever the element's node order
+    n_corners = 3 if elements.shape[1] in (3, 6) else 4
+    inward = vertices[elements[owners, :n_corners]].mean(axis=1) - 0.5 * (a + b)
+    normals[np.einsum('ij,ij->i', normals, inward) > 0] *= -1
+    return normals, lengths
+
+
+# Function to integrate a uniform edge load over the boundary edges of a node set into consistent nodal forces
+#   q        force per unit length (qx, qy), total=True spreads a total force (qx, qy) over the edge length
+#   pressure force per unit area normal to the edge (positive pushes into the plate), times the thickness
+def edge_forces(vertices, elements, index, nodes, q=(0.0, 0.0), pressure=0.0, thickness=None, total=False):
+    selected = np.zeros(len(vertices), dtype=bool)
+    selected[nodes] = True
+    on_set = selected[index.edges].all(axis=1)
+    if not on_set.any():
+        return np.zeros((len(vertices), 2))
+
+    edges = index.edges[on_set]
+    midside = index.midside[on_set]
+    normals, lengths = edge_normals(vertices, elements, edges, index.owners[on_set])
+
+    q = np.asarray(q, dtype=np.float64)
+    if total:
+        q = q / lengths.sum()
+    traction = np.broadcast_to(q, normals.shape)
+    if pressure:
+        if thickness is None:
+            raise ValueError("Pressure loads need the section thickness.")
+        traction = traction - pressure * thickness * normals
+    edge_total = traction * lengths[:, None]
+
+    # Straight 2-node edge: half to each end, 3-node edge: 1/6 to each end and 2/3 to the midside node
+    quadratic = midside >= 0
+    end_share = np.where(quadratic, 1.0 / 6.0, 0.5)[:, None] * edge_total
+    forces = scatter_forces(len(vertices), edges.ravel(), np.repeat(end_share, 2, axis=0))
+    if quadratic.any():
+        forces += scatter_forces(len(vertices), midside[quadratic], 2.0 / 3.0 * edge_total[quadratic])
+    return forces
+
+
+# Function to return the integral of each shape function over each element area, (m, n)
+def shape_integrals(vertices, elements):
+    element_type = element_type_for(elements)
+    points, weights = QUADRATURE[element_type]
+    N, dN = shape_functions(element_type, points)
+    detJ, _ = jacobian(vertices, elements, dN)
+    return np.einsum('gn,g,mg->mn', N, weights, detJ)
+
+
+# Function to integrate a uniform force per unit area (fx, fy) over the elements into consistent nodal forces
+# (a body force per unit volume is passed as body * thickness), total=True spreads a total force over the area
+def area_forces(vertices, elements, f, total=False):
+    integrals = shape_integrals(vertices, elements)
+    f = np.asarray(f, dtype=np.float64)
+    if total:
+        f = f / integrals.sum()
+    return scatter_forces(len(vertices), elements.ravel(), integrals.ravel()[:, None] * f)
@@ -1,11 +1,20 @@
 import sys
 import numpy as np
 import meshio
-from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout
+from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QPushButton, QProgressBar, \
+    QCheckBox, QLabel, QComboBox
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
-from meshpy import triangle
 
+from boundary_index import BoundaryIndex
+from higher_order import elevate_order
+from mesh_cache import MeshCache
+from mesh_io import write_mesh
+from mesh_plot import MeshPreview
+from mesh_quality import improve_mesh, print_quality
+from mesh_worker import MeshJobManager, Debouncer
+from renumber import renumber_mesh, print_report
+from tri_mesher import mesh_plate
 from ui_main import Ui_MainWindow
 
 class MainWindow(QMainWindow):
@@ -49,10 +58,54 @@ class MainWindow(QMainWindow):
         self.mesh_vertices = None
         self.mesh_elements = None
 
+        # On-disk cache of previously generated meshes
+        self.mesh_cache = MeshCache()
+
+        # Vectorized mesh preview
+        self.mesh_preview = MeshPreview(self.ax)
+
+        # Background meshing, the canvas is only updated when a result arrives
+        self.mesh_jobs = MeshJobManager(self)
+        self.mesh_jobs.result_ready.connect(self.show_mesh)
+        self.mesh_jobs.busy_changed.connect(self.update_mesh_busy)
+        self.mesh_jobs.error.connect(self.report_mesh_error)
+
+        # Busy indicator only, the mesher gives no progress to report
+        self.mesh_progress = QProgressBar()
+        self.mesh_progress.setRange(0, 1)
+        self.mesh_progress.setValue(0)
+        self.mesh_progress.setTextVisible(False)
+        self.ui.verticalLayout_14.addWidget(self.mesh_progress)
+
+        # A running mesh cannot be interrupted, the button only throws its result away
+        self.cancel_mesh_btn = QPushButton("Discard Mesh")
+        self.cancel_mesh_btn.setToolTip("Ignore the result of the mesh being generated")
+        self.cancel_mesh_btn.setEnabled(False)
+        self.cancel_mesh_btn.clicked.connect(self.discard_mesh)
+        self.ui.verticalLayout_14.addWidget(self.cancel_mesh_btn)
+
+        # Opt-in live preview, re-meshes once the inputs stop changing
+        self.last_mesh_params = None
+        self.live_preview = Debouncer(self.live_update, parent=self)
+        self.live_preview_check = QCheckBox("Live Preview")
+        self.live_preview_check.toggled.connect(self.toggle_live_preview)
+        self.ui.verticalLayout_14.addWidget(self.live_preview_check)
+
+        self.mesh_info_label = QLabel("")
+        self.ui.verticalLayout_14.addWidget(self.mesh_info_label)
+
+        # Element order of the exported mesh, the preview always shows the linear mesh
+        self.element_order = 1
+        self.element_order_input = QComboBox()
+        self.element_order_input.addItems(["Linear (3-node)", "Quadratic (6-node)"])
+        self.element_order_input.currentIndexChanged.connect(self.update_element_order)
+        self.ui.verticalLayout_14.addWidget(self.element_order_input)
+
     def update_width(self, text):
         try:
             self.plate_geometry[0] = float(text)
             print("Width Updated with: " + str(self.plate_geometry[0]))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -60,6 +113,7 @@ class MainWindow(QMainWindow):
         try:
             self.plate_geometry[1] = float(text)
             print("Length Updated with: " + str(self.plate_geometry[1]))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -67,6 +121,7 @@ class MainWindow(QMainWindow):
         try:
             self.plate_geometry[2] = float(text)
             print("Thickness Updated with: " + str(self.plate_geometry[2]))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -74,6 +129,7 @@ class MainWindow(QMainWindow):
         try:
             self.mesh_size = float(text)
             print("Mesh Size Updated with: " + str(self.mesh_size))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -84,6 +140,12 @@ class MainWindow(QMainWindow):
         elif index == 1:  # Quad mesh
             self.mesh_type = 'quad'
 
+        self.schedule_live_update()
+
+    def update_element_order(self, index):
+        self.element_order = index + 1
+        print("Element Order Updated with: " + str(self.element_order))
+
     def plot_plate(self):
         width = self.plate_geometry[0]
         length = self.plate_geometry[1]
@@ -99,71 +161,101 @@ class MainWindow(QMainWindow):
 
         self.canvas.draw()
 
+    def mesh_params(self):
+        return {"mesher": "triangle", "width": self.plate_geometry[0], "length": self.plate_geometry[1],
+                "mesh_size": self.mesh_size, "mesh_type": self.mesh_type}
+
     def generate_mesh(self):
+        self.submit_mesh(export=True)
+
+    # Live preview results are only drawn, the mesh file is written for an explicit Generate
+    def submit_mesh(self, export):
         print("Generating mesh...")
+        params = self.mesh_params()
+        width = params["width"]
+        length = params["length"]
+        mesh_size = params["mesh_size"]
+
+        # Create triangle mesh, reusing a cached one when the parameters are unchanged, the parameters come back
+        # with the mesh and become last_mesh_params once it is shown
+        self.mesh_jobs.submit(
+            lambda: (self.mesh_cache.fetch(params, lambda: mesh_plate(width, length, mesh_size)), export, params))
+
+    def show_mesh(self, result):
+        (self.mesh_vertices, self.mesh_elements), export, self.last_mesh_params = result
         width = self.plate_geometry[0]
         length = self.plate_geometry[1]
-        mesh_size = self.mesh_size
-
-        # Clear previous mesh
-        self.ax.clear()
-
-        # Define the points of the plate
-        points = [(0.0, 0.0), (width, 0.0), (width, length), (0.0, length)]
-
-        # Create triangle mesh
-        info = triangle.MeshInfo()
-        info.set_points(points)
-        info.set_facets([(0, 1), (1, 2), (2, 3), (3, 0)])
-        mesh = triangle.build(info, max_volume=mesh_size)
-
-        self.mesh_vertices = mesh.points
-        self.mesh_elements = mesh.elements
 
         # Plot mesh
-        for element in self.mesh_elements:
-            if len(element) != 3:
-                raise ValueError("Elements with more than three nodes are not supported.")
-
-            # Plot triangle elements
-            x = [self.mesh_vertices[node][0] for node in element]
-            y = [self.mesh_vertices[node][1] for node in element]
-            x.append(x[0])  # Close the loop
-            y.append(y[0])  # Close the loop
-            self.ax.plot(x, y, 'k-', linewidth=0.5)  # Black lines
-
-            # Fill triangles with blue color
-            x_tri = [self.mesh_vertices[node][0] for node in element]
-            y_tri = [self.mesh_vertices[node][1] for node in element]
-            self.ax.fill(x_tri, y_tri, color='blue', alpha=0.3)  # Blue fill, with some transparency
+        self.mesh_preview.draw(self.mesh_vertices, self.mesh_elements)
 
         # Set plot limits
         self.ax.set_xlim(0, width)
         self.ax.set_ylim(0, length)
 
         # Update canvas to reflect the changes
-        self.canvas.draw()
+        self.canvas.draw_idle()
+        self.mesh_info_label.setText(f"{len(self.mesh_elements)} elements, {len(self.mesh_vertices)} nodes")
 
-        self.export_mesh_data("mesh_file")
+        if export:
+            self.export_mesh_data("mesh_file.feamesh")
         print("Mesh generation complete")
 
+    def update_mesh_busy(self, busy):
+        self.cancel_mesh_btn.setEnabled(busy)
+
+        # A (0, 0) range shows Qt's indeterminate busy animation
+        self.mesh_progress.setRange(0, 0 if busy else 1)
+
+    def report_mesh_error(self, message):
+        # The live preview retries the same parameters after a failure
+        self.last_mesh_params = None
+        print("Mesh generation failed:\n" + message)
+
+    def discard_mesh(self):
+        self.mesh_jobs.cancel()
+        self.last_mesh_params = None
+
+    def toggle_live_preview(self, enabled):
+        if enabled:
+            self.schedule_live_update()
+        else:
+            self.live_preview.cancel()
+
+    def schedule_live_update(self):
+        if self.live_preview_check.isChecked():
+            self.live_preview.trigger()
+
+    def live_update(self):
+        params = self.mesh_params()
+        if params["width"] <= 0 or params["length"] <= 0 or params["mesh_size"] <= 0:
+            return
+
+        # Only re-mesh when a value that affects the mesh has actually changed
+        if params == self.last_mesh_params:
+            return
+
+        self.submit_mesh(export=False)
+
     def export_mesh_data(self, filename):
-        with open(filename, 'w') as file:
-            # Write node coordinates
-            file.write("## Node coordinates\n")
-            for i, vertex in enumerate(self.mesh_vertices):
-                file.write(f"node {i + 1} {vertex[0]} {vertex[1]}\n")
-
-            # Write element connectivity
-            file.write("\n## Element connectivity\n")
-            for i, element in enumerate(self.mesh_elements):
-                if len(element) == 3:
-                    file.write(f"element tri31 {i + 1} {' '.join(str(node + 1) for node in element)}\n")
-                else:
-                    raise ValueError("Elements with more than three nodes are not supported.")
+        # Smooth distorted elements before writing
+        vertices, before, after = improve_mesh(self.mesh_vertices, self.mesh_elements)
+        print_quality(before, after)
 
-        print("Mesh file generated")
+        # Add midside nodes for 6-node triangles
+        elements = self.mesh_elements
+        if self.element_order == 2:
+            vertices, elements = elevate_order(vertices, elements)
 
+        # Renumber nodes to reduce the stiffness matrix bandwidth/profile
+        vertices, elements, report = renumber_mesh(vertices, elements)
+        print_report(report)
+
+        # Write node coordinates, element connectivity and the boundary edge groups to the binary mesh container
+        boundary = BoundaryIndex(vertices, elements)
+        write_mesh(filename, vertices, elements, boundary_tags=boundary.boundary_tags())
+
+        print("Mesh file generated")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
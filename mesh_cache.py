@@ -0,0 +1,89 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+
+# Bump when the stored layout changes so stale entries are never read back
+CACHE_VERSION = 1
+
+CACHE_DIR = '.mesh_cache'
+MAX_CACHE_BYTES = 256 * 1024 * 1024  # 256 MB
+
+
+# Function to build a content hash from the geometry and meshing parameters
+def mesh_key(params):
+    payload = json.dumps({"version": CACHE_VERSION, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# On-disk LRU cache of mesh arrays, stored as uncompressed .npz files
+class MeshCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                vertices = data['vertices']
+                elements = data['elements'].astype(np.int64)
+        except (OSError, KeyError, ValueError):
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        return vertices, elements
+
+    def put(self, key, vertices, elements):
+        vertices = np.asarray(vertices, dtype=np.float64)
+        elements = np.asarray(elements)
+
+        # Store connectivity in the smallest integer type that fits
+        index_dtype = np.int32 if len(vertices) < np.iinfo(np.int32).max else np.int64
+
+        buffer = io.BytesIO()
+        np.savez(buffer, vertices=vertices, elements=elements.astype(index_dtype))
+
+        # Write to a temporary file first so a crash never leaves a truncated entry
+        path = self.path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Drop least recently used entries until the cache fits its size cap
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def fetch(self, params, build):
+        key = mesh_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            print("Mesh loaded from cache")
+            return cached
+
+        vertices, elements = build()
+        self.put(key, vertices, elements)
+        return np.asarray(vertices), np.asarray(elements)
@@ -0,0 +1,191 @@
+import json
+import struct
+
+import meshio
+import numpy as np
+
+# Binary mesh container layout:
+#   8 bytes   magic
+#   8 bytes   header length (little-endian uint64)
+#   n bytes   JSON header (format version, array dtypes/shapes/offsets, element type names)
+#   padding   up to the next ALIGNMENT boundary
+#   arrays    raw C-ordered data, each starting on an ALIGNMENT boundary
+MAGIC = b'FEAMESH\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Element type codes stored per element
+ELEMENT_TYPES = {'tri31': 1, 'quad4': 2, 'tri6': 3, 'quad8': 4, 'quad9': 5}
+NODES_PER_ELEMENT = {'tri31': 3, 'quad4': 4, 'tri6': 6, 'quad8': 8, 'quad9': 9}
+
+# OpenSees plane element for each element type, node order: corners, midside nodes, centre node
+OPENSEES_ELEMENTS = {'tri31': 'Tri31', 'quad4': 'quad', 'tri6': 'tri6n', 'quad8': 'quad8n', 'quad9': 'quad9n'}
+
+# meshio cell type for each element type
+MESHIO_CELLS = {'tri31': 'triangle', 'quad4': 'quad', 'tri6': 'triangle6', 'quad8': 'quad8', 'quad9': 'quad9'}
+
+# Named boundary groups (gmsh physical curves), node i is in group k when bit k of boundary_tags[i] is set
+BOUNDARY_GROUPS = ('bottom', 'right', 'top', 'left', 'opening')
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Function to pick the element type name from the number of nodes per element
+def element_type_for(elements):
+    nodes = np.asarray(elements).shape[1]
+    for name, count in NODES_PER_ELEMENT.items():
+        if count == nodes:
+            return name
+    raise ValueError(f"Elements with {nodes} nodes are not supported.")
+
+
+# Function to write mesh arrays to the binary mesh container
+def write_mesh(filename, vertices, elements, element_type=None, boundary_tags=None):
+    vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+    elements = np.asarray(elements)
+    if element_type is None:
+        element_type = element_type_for(elements)
+
+    index_dtype = np.int32 if len(vertices) < np.iinfo(np.int32).max else np.int64
+    if boundary_tags is None:
+        boundary_tags = np.zeros(len(vertices), dtype=np.int32)
+
+    arrays = {
+        "vertices": vertices,
+        "elements": np.ascontiguousarray(elements, dtype=index_dtype),
+        "element_types": np.full(len(elements), ELEMENT_TYPES[element_type], dtype=np.uint8),
+        "boundary_tags": np.ascontiguousarray(boundary_tags, dtype=np.int32),
+    }
+
+    # Array offsets are relative to the start of the data block
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "arrays": entries,
+        "element_types": {str(code): name for name, code in ELEMENT_TYPES.items()},
+    }).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]["offset"])
+            f.write(array.tobytes())
+
+
+def _read_header(filename):
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None, 0
+        (header_length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+    if header["version"] > FORMAT_VERSION:
+        raise ValueError(f"Mesh file version {header['version']} is newer than supported ({FORMAT_VERSION}).")
+
+    return header, _align(len(MAGIC) + 8 + header_length)
+
+
+# Function to read the binary mesh container, arrays are memory-mapped (read only) by default
+def read_binary_mesh(filename, mmap=True):
+    header, data_start = _read_header(filename)
+    if header is None:
+        raise ValueError(f"{filename} is not a binary mesh file.")
+
+    mesh = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        offset = data_start + entry["offset"]
+        if int(np.prod(shape)) == 0:
+            mesh[name] = np.empty(shape, dtype=dtype)
+        elif mmap:
+            mesh[name] = np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=shape)
+        else:
+            count = int(np.prod(shape))
+            mesh[name] = np.fromfile(filename, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+    mesh["element_type_names"] = {int(code): name for code, name in header["element_types"].items()}
+    return mesh
+
+
+# Function to parse the legacy text mesh_file ("node i x y" / "element tri31 i n1 n2 n3")
+def read_text_mesh(filename):
+    nodes = []
+    elements = []
+    element_type = None
+    with open(filename, 'r') as file:
+        for line in file:
+            if line.startswith('node'):
+                nodes.append([float(value) for value in line.split()[2:]])
+            elif line.startswith('element'):
+                _, element_type, _, *element_nodes = line.split()
+                elements.append([int(node) - 1 for node in element_nodes])
+
+    vertices = np.array(nodes, dtype=np.float64)
+    elements = np.array(elements, dtype=np.int64)
+    return _mesh_dict(vertices, elements, element_type or element_type_for(elements))
+
+
+# Function to read the nodes of the named physical curves of a meshio mesh into a boundary_tags bit mask
+def physical_boundary_tags(mesh):
+    tags = np.zeros(len(mesh.points), dtype=np.int32)
+    physical = mesh.cell_data.get("gmsh:physical")
+    if physical is None:
+        return tags
+
+    names = {int(tag): name for name, (tag, dim) in mesh.field_data.items() if dim == 1}
+    for cell, cell_tags in zip(mesh.cells, physical):
+        if cell.type not in ('line', 'line3'):
+            continue
+        for tag in np.unique(cell_tags):
+            if names.get(int(tag)) in BOUNDARY_GROUPS:
+                nodes = cell.data[cell_tags == tag].ravel()
+                tags[nodes] |= 1 << BOUNDARY_GROUPS.index(names[int(tag)])
+    return tags
+
+
+# Function to read a gmsh .msh file through meshio
+def read_msh(filename):
+    mesh = meshio.read(filename)
+
+    # Prefer quadrilaterals over triangles, and quadratic over linear elements
+    for element_type in ('quad9', 'quad8', 'quad4', 'tri6', 'tri31'):
+        for cell in mesh.cells:
+            if cell.type == MESHIO_CELLS[element_type]:
+                return _mesh_dict(mesh.points, cell.data, element_type, physical_boundary_tags(mesh))
+    raise ValueError("No quadrilateral or triangular cells found in the mesh.")
+
+
+def _mesh_dict(vertices, elements, element_type, boundary_tags=None):
+    if boundary_tags is None:
+        boundary_tags = np.zeros(len(vertices), dtype=np.int32)
+
+    return {
+        "vertices": np.asarray(vertices, dtype=np.float64),
+        "elements": np.asarray(elements),
+        "element_types": np.full(len(elements), ELEMENT_TYPES[element_type], dtype=np.uint8),
+        "boundary_tags": boundary_tags,
+        "element_type_names": {code: name for name, code in ELEMENT_TYPES.items()},
+    }
+
+
+# Function to read any supported mesh file: binary container, .msh or legacy text mesh_file
+def read_mesh(filename, mmap=True):
+    with open(filename, 'rb') as f:
+        is_binary = f.read(len(MAGIC)) == MAGIC
+
+    if is_binary:
+        return read_binary_mesh(filename, mmap=mmap)
+    if filename.endswith('.msh'):
+        return read_msh(filename)
+    return read_text_mesh(filename)
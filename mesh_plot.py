@@ -0,0 +1,31 @@
+import numpy as np
+from matplotlib.collections import PolyCollection
+
+
+# Mesh preview drawn as a single PolyCollection instead of two artists per element
+class MeshPreview:
+    def __init__(self, ax, incremental=True):
+        self.ax = ax
+        self.collection = None
+
+        # When True, regenerated meshes only swap the polygon data of the existing collection
+        self.incremental = incremental
+
+    def draw(self, vertices, elements):
+        # Gather every element's corner coordinates in one indexing operation, shape (n_elements, n_nodes, 2)
+        polygons = np.asarray(vertices)[np.asarray(elements), :2]
+
+        if self.incremental and self.collection is not None and self.collection.axes is self.ax:
+            self.collection.set_verts(polygons)
+            return self.collection
+
+        # Full redraw, the axes are cleared and a new collection is added
+        self.ax.clear()
+        self.collection = PolyCollection(
+            polygons,
+            facecolors=(0.0, 0.0, 1.0, 0.3),  # Blue fill, with some transparency
+            edgecolors='k',  # Black lines
+            linewidths=0.5,
+        )
+        self.ax.add_collection(self.collection)
+        return self.collection
@@ -0,0 +1,133 @@
+import numpy as np
+import scipy.sparse as sp
+
+# Ideal corner angle (degrees) for equilateral triangles and square quads
+IDEAL_ANGLE = {3: 60.0, 4: 90.0}
+
+# Thresholds used to count poor elements in the report
+MAX_ASPECT_RATIO = 5.0
+MIN_ANGLE = 20.0
+MIN_JACOBIAN_RATIO = 0.3
+MAX_SKEW = 0.8
+
+
+# Function to compute quality metrics for every element of a tri3/quad4 mesh at once
+def element_quality(vertices, elements):
+    xy = np.asarray(vertices)[np.asarray(elements), :2]  # (n_elements, n_nodes, 2)
+    n_nodes = xy.shape[1]
+
+    # Edge k runs from corner k to corner k + 1
+    edges = np.roll(xy, -1, axis=1) - xy
+    lengths = np.linalg.norm(edges, axis=2)
+
+    # Corner k sits between the incoming edge k - 1 and the outgoing edge k
+    incoming = -np.roll(edges, 1, axis=1)
+    outgoing = edges
+    cross = incoming[:, :, 0] * outgoing[:, :, 1] - incoming[:, :, 1] * outgoing[:, :, 0]
+    dot = np.sum(incoming * outgoing, axis=2)
+    angles = np.degrees(np.arctan2(np.abs(cross), dot))
+
+    # The Jacobian at each corner is proportional to the cross product of the two edges (negative = inverted)
+    jacobians = -cross
+    jacobian_ratio = jacobians.min(axis=1) / np.abs(jacobians).max(axis=1)
+
+    ideal = IDEAL_ANGLE[n_nodes]
+    min_angle = angles.min(axis=1)
+    max_angle = angles.max(axis=1)
+    skew = np.maximum((max_angle - ideal) / (180.0 - ideal), (ideal - min_angle) / ideal)
+
+    return {
+        "aspect_ratio": lengths.max(axis=1) / lengths.min(axis=1),
+        "min_angle": min_angle,
+        "max_angle": max_angle,
+        "jacobian_ratio": jacobian_ratio,
+        "skew": skew,
+    }
+
+
+# Function to summarise quality metrics into worst values and counts of poor elements
+def quality_report(vertices, elements):
+    quality = element_quality(vertices, elements)
+    return {
+        "elements": len(elements),
+        "max_aspect_ratio": float(quality["aspect_ratio"].max()),
+        "min_angle": float(quality["min_angle"].min()),
+        "min_jacobian_ratio": float(quality["jacobian_ratio"].min()),
+        "max_skew": float(quality["skew"].max()),
+        "poor_aspect_ratio": int(np.count_nonzero(quality["aspect_ratio"] > MAX_ASPECT_RATIO)),
+        "poor_angle": int(np.count_nonzero(quality["min_angle"] < MIN_ANGLE)),
+        "poor_jacobian": int(np.count_nonzero(quality["jacobian_ratio"] < MIN_JACOBIAN_RATIO)),
+        "poor_skew": int(np.count_nonzero(quality["skew"] > MAX_SKEW)),
+        "inverted": int(np.count_nonzero(quality["jacobian_ratio"] <= 0)),
+    }
+
+
+# Function to return the unique element edges and how many elements share each one
+def mesh_edges(elements):
+    elements = np.asarray(elements)
+    edges = np.stack([elements, np.roll(elements, -1, axis=1)], axis=2).reshape(-1, 2)
+    edges = np.sort(edges, axis=1)
+    return np.unique(edges, axis=0, return_counts=True)
+
+
+# Function to find boundary nodes, i.e. nodes on edges used by a single element
+def boundary_nodes(elements, n_nodes):
+    edges, counts = mesh_edges(elements)
+    mask = np.zeros(n_nodes, dtype=bool)
+    mask[edges[counts == 1].ravel()] = True
+    return mask
+
+
+# Function to apply guarded Laplacian smoothing, boundary nodes stay fixed
+def smooth_mesh(vertices, elements, iterations=10, relaxation=0.5):
+    vertices = np.array(vertices, dtype=np.float64)
+    elements = np.asarray(elements)
+    n_nodes = len(vertices)
+
+    # Node adjacency from element edges
+    edges, _ = mesh_edges(elements)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    adjacency = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_nodes, n_nodes))
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+
+    free = ~boundary_nodes(elements, n_nodes) & (degree > 0)
+
+    def worst(xy):
+        quality = element_quality(xy, elements)
+        return min(quality["jacobian_ratio"].min(), quality["min_angle"].min() / IDEAL_ANGLE[elements.shape[1]])
+
+    current = worst(vertices)
+    for _ in range(iterations):
+        average = adjacency @ vertices[:, :2] / np.maximum(degree, 1)[:, None]
+
+        candidate = vertices.copy()
+        candidate[free, :2] += relaxation * (average[free] - vertices[free, :2])
+
+        # Only keep the step if the worst element did not get worse
+        candidate_worst = worst(candidate)
+        if candidate_worst < current:
+            break
+        vertices, current = candidate, candidate_worst
+
+    return vertices
+
+
+# Function to smooth a mesh and report its quality before and after
+def improve_mesh(vertices, elements, iterations=10):
+    before = quality_report(vertices, elements)
+    vertices = smooth_mesh(vertices, elements, iterations=iterations)
+    after = quality_report(vertices, elements)
+    return vertices, before, after
+
+
+# Function to print a before/after quality report
+def print_quality(before, after):
+    print(f"Mesh quality ({before['elements']} elements), before -> after smoothing")
+    for key, label in (("max_aspect_ratio", "max aspect ratio"), ("min_angle", "min angle"),
+                       ("min_jacobian_ratio", "min Jacobian ratio"), ("max_skew", "max skew")):
+        print(f"  {label}: {before[key]:.3f} -> {after[key]:.3f}")
+    for key, label in (("poor_aspect_ratio", "aspect ratio"), ("poor_angle", "angle"),
+                       ("poor_jacobian", "Jacobian"), ("poor_skew", "skew")):
+        print(f"  poor {label}: {before[key]} -> {after[key]}")
+    print(f"  inverted: {before['inverted']} -> {after['inverted']}")
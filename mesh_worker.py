@@ -0,0 +1,141 @@
+import itertools
+import traceback
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+
+class MeshJobSignals(QObject):
+    finished = Signal(int, object)  # job id, build result
+    failed = Signal(int, str)  # job id, error message
+    cancelled = Signal(int)  # job id
+
+
+# A single meshing request run on a worker thread
+class MeshJob(QRunnable):
+    def __init__(self, job_id, build):
+        super(MeshJob, self).__init__()
+        self.job_id = job_id
+        self.build = build
+        self.cancel_requested = False
+        self.signals = MeshJobSignals()
+
+        # The manager keeps the Python reference, so Qt must not delete the job
+        self.setAutoDelete(False)
+
+    # Function to discard the job's result, triangle and gmsh cannot be interrupted so a running mesh still finishes
+    def cancel(self):
+        self.cancel_requested = True
+
+    def run(self):
+        if self.cancel_requested:
+            self.signals.cancelled.emit(self.job_id)
+            return
+
+        try:
+            result = self.build()
+        except Exception:
+            self.signals.failed.emit(self.job_id, traceback.format_exc())
+            return
+
+        # Triangle and gmsh cannot be interrupted mid-run, so a cancelled job just drops its result
+        if self.cancel_requested:
+            self.signals.cancelled.emit(self.job_id)
+            return
+
+        self.signals.finished.emit(self.job_id, result)
+
+
+# Runs meshing jobs off the GUI thread, the newest request always wins
+# Meshing is one blocking call, so the manager only reports busy/idle, not a percentage
+class MeshJobManager(QObject):
+    result_ready = Signal(object)  # What the newest job's build returned
+    busy_changed = Signal(bool)
+    error = Signal(str)
+
+    def __init__(self, parent=None):
+        super(MeshJobManager, self).__init__(parent)
+
+        # Neither triangle nor gmsh is thread-safe, so jobs run one at a time
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.job_ids = itertools.count(1)
+        self.latest_id = 0
+        self.jobs = {}
+
+    def submit(self, build):
+        # Any queued or running job is now outdated
+        self.cancel_outstanding()
+
+        job = MeshJob(next(self.job_ids), build)
+        job.signals.finished.connect(self.on_finished)
+        job.signals.failed.connect(self.on_failed)
+        job.signals.cancelled.connect(self.on_cancelled)
+
+        self.latest_id = job.job_id
+        self.jobs[job.job_id] = job
+        self.busy_changed.emit(True)
+
+        self.pool.start(job)
+        return job.job_id
+
+    def cancel_outstanding(self):
+        for job_id, job in list(self.jobs.items()):
+            job.cancel()
+
+            # Jobs still waiting in the queue are removed without ever running
+            if self.pool.tryTake(job):
+                self.jobs.pop(job_id, None)
+
+    # Function to discard the outstanding jobs' results, a mesh already running is not stopped
+    def cancel(self):
+        self.cancel_outstanding()
+
+        # Forget the latest request so a result still in flight is ignored
+        if self.latest_id:
+            self.latest_id = 0
+            self.busy_changed.emit(False)
+
+    def is_busy(self):
+        return bool(self.jobs)
+
+    def on_finished(self, job_id, result):
+        self.jobs.pop(job_id, None)
+        if job_id != self.latest_id:
+            return
+
+        self.latest_id = 0
+        self.result_ready.emit(result)
+        self.busy_changed.emit(False)
+
+    def on_failed(self, job_id, message):
+        self.jobs.pop(job_id, None)
+        if job_id != self.latest_id:
+            return
+
+        self.latest_id = 0
+        self.error.emit(message)
+        self.busy_changed.emit(False)
+
+    def on_cancelled(self, job_id):
+        self.jobs.pop(job_id, None)
+
+    def wait(self):
+        self.pool.waitForDone()
+
+
+# Collapses bursts of calls (e.g. keystrokes) into one callback after a quiet period
+class Debouncer(QObject):
+    def __init__(self, callback, delay=300, parent=None):
+        super(Debouncer, self).__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(callback)
+
+    def trigger(self):
+        # Restarting the timer drops the previous pending call
+        self.timer.start()
+
+    def cancel(self):
+        self.timer.stop()
@@ -0,0 +1,352 @@
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import openseespy.opensees as ops
+
+from boundary_index import BoundaryIndex
+from load_integration import area_forces, edge_forces
+from mesh_io import OPENSEES_ELEMENTS, element_type_for, read_mesh
+from results import node_results
+from solver_select import select_solver
+
+# Material tag shared by every element
+MATERIAL_TAG = 1
+
+# Materials with a linear response, models built only from these are solved without equilibrium iterations
+LINEAR_MATERIALS = ('ElasticIsotropic',)
+
+# Values a material spec may leave out (J2Plasticity's fu defaults to its fy)
+MATERIAL_DEFAULTS = {"type": 'ElasticIsotropic', "rho": 0.0, "delta": 0.0, "H": 0.0}
+
+# Analysis setup used by the example scripts
+DEFAULT_ANALYSIS = {
+    "algorithm": "auto",  # Linear for elastic models, Newton otherwise
+    "constraints": "Plain",
+    "numberer": "RCM",
+    "system": "auto",  # Chosen per mesh by solver_select
+    "test": ["NormDispIncr", 1.0e-6, 6],
+    "integrator": ["LoadControl", 1],
+    "steps": 1,
+}
+
+
+# Context manager that adds the elapsed time of a block to timings[name]
+@contextmanager
+def timed(timings, name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - t0
+
+
+# Function to read a mesh file into (vertices (N, 2), elements (M, n)) arrays with 0-based node ids
+# boundary_tags=True also returns the per-node boundary group bit mask stored in the file
+# Binary mesh files are memory-mapped, the arrays are read-only views of the file (nothing here writes to them)
+def load_mesh(filename, boundary_tags=False):
+    mesh = read_mesh(filename)
+    if boundary_tags:
+        return np.asarray(mesh["vertices"])[:, :2], np.asarray(mesh["elements"]), np.asarray(mesh["boundary_tags"])
+    return np.asarray(mesh["vertices"])[:, :2], np.asarray(mesh["elements"])
+
+
+# Function to select 0-based node ids: an edge name ('left', 'right', 'bottom', 'top', 'ends', 'all')
+# or a list of 1-based node tags, index = BoundaryIndex of the mesh (see boundary_index.py for its selections),
+# without one every query scans the node coordinates
+def select_nodes(vertices, where, tol=1e-6, index=None):
+    if index is not None:
+        return index.select(where)
+    if not isinstance(where, str):
+        return np.asarray(where, dtype=np.int64) - 1
+
+    x = vertices[:, 0]
+    y = vertices[:, 1]
+    tol = tol * max(np.ptp(x), np.ptp(y))
+    edges = {
+        "left": np.abs(x - x.min()) <= tol,
+        "right": np.abs(x - x.max()) <= tol,
+        "bottom": np.abs(y - y.min()) <= tol,
+        "top": np.abs(y - y.max()) <= tol,
+        "all": np.ones(len(vertices), dtype=bool),
+    }
+    edges["ends"] = edges["left"] | edges["right"]
+
+    if where not in edges:
+        raise ValueError(f"Unknown node selection: {where}")
+    return np.flatnonzero(edges[where])
+
+
+# Function to lump a line load (force per unit length) on the tributary length of each edge node
+def tributary_lengths(vertices, nodes):
+    xy = vertices[nodes]
+
+    # Walk along the edge in the direction it extends furthest
+    axis = 0 if np.ptp(xy[:, 0]) >= np.ptp(xy[:, 1]) else 1
+    order = np.argsort(xy[:, axis])
+    segments = np.linalg.norm(np.diff(xy[order], axis=0), axis=1)
+
+    lengths = np.zeros(len(nodes))
+    lengths[order[:-1]] += segments / 2
+    lengths[order[1:]] += segments / 2
+    return lengths
+
+
+# Function to create the nodes, material and elements of a plane-stress/strain model
+def build_domain(vertices, elements, material, section, timings):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    elements = np.asarray(elements)
+
+    with timed(timings, "wipe"):
+        ops.wipe()
+        ops.model('basic', '-ndm', 2, '-ndf', 2)
+
+    # Plain Python lists and a local function reference keep the per-entity call overhead down
+    with timed(timings, "nodes"):
+        node = ops.node
+        for node_id, (x, y) in enumerate(vertices[:, :2].tolist(), start=1):
+            node(node_id, x, y)
+
+    add_material(material, timings)
+    add_elements(elements, section, timings)
+
+
+# Function to fill in the values a material spec leaves out, as add_material uses them
+def material_values(material):
+    values = {**MATERIAL_DEFAULTS, **material}
+    if "fy" in values:
+        values.setdefault("fu", values["fy"])
+    return values
+
+
+# Function to create the nDMaterial shared by the elements
+#   {"type": "ElasticIsotropic", "E": ..., "nu": ..., "rho": 0}
+#   {"type": "J2Plasticity", "E": ..., "nu": ..., "fy": ..., "fu": fy, "delta": 0, "H": 0}   von Mises plasticity,
+#       yield stress fy saturating to fu with exponent delta, plus linear hardening modulus H
+def add_material(material, timings, material_tag=MATERIAL_TAG):
+    material = material_values(material)
+    with timed(timings, "materials"):
+        material_type = material["type"]
+        if material_type == 'ElasticIsotropic':
+            ops.nDMaterial('ElasticIsotropic', material_tag, material["E"], material["nu"], material["rho"])
+        elif material_type == 'J2Plasticity':
+            bulk = material["E"] / (3 * (1 - 2 * material["nu"]))
+            shear = material["E"] / (2 * (1 + material["nu"]))
+            ops.nDMaterial('J2Plasticity', material_tag, bulk, shear, material["fy"], material["fu"],
+                           material["delta"], material["H"])
+        else:
+            raise ValueError(f"Unsupported material type: {material_type}")
+
+
+# Function to create elements 1..M, each holding its own copy of the material
+def add_elements(elements, section, timings, material_tag=MATERIAL_TAG):
+    with timed(timings, "elements"):
+        element_name = OPENSEES_ELEMENTS[element_type_for(elements)]
+        args = [section["thickness"], section.get("type", 'PlaneStress'), material_tag]
+        if section.get("pressure"):
+            args.append(section["pressure"])
+
+        element = ops.element
+        for i, nodes in enumerate((np.asarray(elements) + 1).tolist(), start=1):
+            element(element_name, i, *nodes, *args)
+
+
+# Function to fix the supported nodes, supports = [{"where": ..., "dofs": [1, 1]}, ...]
+def apply_supports(vertices, supports, timings, index=None):
+    with timed(timings, "supports"):
+        # Combine overlapping supports so each node is fixed once
+        fixity = np.zeros((len(vertices), 2), dtype=np.int64)
+        for support in supports:
+            nodes = select_nodes(vertices, support["where"], index=index)
+            fixity[nodes] = np.maximum(fixity[nodes], support.get("dofs", [1, 1]))
+
+        fixed = np.flatnonzero(np.any(fixity, axis=1))
+        for node_id, dofs in zip((fixed + 1).tolist(), fixity[fixed].tolist()):
+            ops.fix(node_id, *dofs)
+
+
+# Function to sum load specs into nodal forces (N, 2), distributed loads are integrated consistently with the
+# element shape functions (see load_integration.py)
+#   {"type": "nodal", "where": ..., "fx": 0, "fy": -5}                 force on every selected node
+#   {"type": "nodal", "where": "top", "fy": -7500, "total": True}      force shared evenly by the nodes
+#   {"type": "line", "where": "top", "qx": 0, "qy": -1500}             force per unit length along the boundary edges
+#   {"type": "line", "where": "top", "qy": -7500, "total": True}       total force spread uniformly along the edges
+#   {"type": "pressure", "where": "left", "p": 10}                     force per unit area normal to the edges
+#                                                                      (positive pushes into the plate)
+#   {"type": "area", "fx": 0, "fy": -5}                                force per unit plate area, "total": True to
+#                                                                      spread a total force over the plate
+#   {"type": "body", "bx": 0, "by": -24e-6}                            force per unit volume (self-weight)
+def load_vector(vertices, loads, elements=None, thickness=None, index=None):
+    vertices = np.asarray(vertices, dtype=np.float64)[:, :2]
+    if elements is not None:
+        elements = np.asarray(elements)
+        if index is None:
+            index = BoundaryIndex(vertices, elements)
+
+    forces = np.zeros((len(vertices), 2))
+    for load in loads:
+        if load["type"] in ('body', 'area'):
+            if elements is None:
+                raise ValueError(f"{load['type'].capitalize()} loads need the element connectivity.")
+            if load["type"] == 'body':
+                if thickness is None:
+                    raise ValueError("Body loads need the section thickness.")
+                f = thickness * np.array([load.get("bx", 0.0), load.get("by", 0.0)])
+            else:
+                f = np.array([load.get("fx", 0.0), load.get("fy", 0.0)])
+            forces += area_forces(vertices, elements, f, total=load.get("total", False))
+            continue
+
+        nodes = select_nodes(vertices, load["where"], index=index)
+        if load["type"] == 'nodal':
+            scale = 1.0 / len(nodes) if load.get("total") else 1.0
+            np.add.at(forces, nodes, scale * np.array([load.get("fx", 0.0), load.get("fy", 0.0)]))
+        elif load["type"] in ('line', 'pressure'):
+            q = np.array([load.get("qx", 0.0), load.get("qy", 0.0)])
+            if elements is not None:
+                forces += edge_forces(vertices, elements, index, nodes, q, load.get("p", 0.0), thickness,
+                                      total=load.get("total", False))
+            elif load["type"] == 'line' and not load.get("total"):
+                # Without the elements the edge is found by sorting its nodes, uniform loads only
+                np.add.at(forces, nodes, tributary_lengths(vertices, nodes)[:, None] * q)
+            else:
+                raise ValueError(f"{load['type'].capitalize()} loads need the element connectivity.")
+        else:
+            raise ValueError(f"Unsupported load type: {load['type']}")
+    return forces
+
+
+# Function to add a load pattern holding nodal forces, the forces are built in NumPy beforehand so this is one
+# ops.load call per loaded node (openseespy has no bulk nodal load command)
+def add_load_pattern(forces, pattern_tag=1, series='Linear'):
+    ops.timeSeries(series, pattern_tag)
+    ops.pattern('Plain', pattern_tag, pattern_tag)
+
+    loaded = np.flatnonzero(np.any(forces != 0, axis=1))
+    load = ops.load
+    for node_id, (fx, fy) in zip((loaded + 1).tolist(), forces[loaded].tolist()):
+        load(node_id, fx, fy)
+
+
+# Function to apply load specs in one load pattern
+def apply_loads(vertices, loads, timings, pattern_tag=1, elements=None, thickness=None, index=None):
+    with timed(timings, "loads"):
+        add_load_pattern(load_vector(vertices, loads, elements, thickness, index), pattern_tag)
+
+
+# Function to check whether a model responds linearly, so one factorization per step gives the exact answer
+def is_linear_elastic(material):
+    return material.get("type", 'ElasticIsotropic') in LINEAR_MATERIALS
+
+
+# Function to set up the static analysis, missing keys fall back to DEFAULT_ANALYSIS
+def setup_analysis(analysis, timings):
+    analysis = {**DEFAULT_ANALYSIS, **(analysis or {})}
+    with timed(timings, "analysis_setup"):
+        ops.algorithm(analysis["algorithm"])
+        ops.constraints(analysis["constraints"])
+        ops.numberer(analysis["numberer"])
+        ops.integrator(*analysis["integrator"])
+        ops.system(analysis["system"])
+
+        # The Linear algorithm takes a single solve per step and never checks convergence
+        if analysis["algorithm"] != 'Linear':
+            ops.test(*analysis["test"])
+        ops.analysis('Static')
+    return analysis
+
+
+# Function to build the whole OpenSees model from mesh arrays and specs, returns the per-phase timings
+# boundary_tags = per-node boundary group bit mask from the mesh file or gmsh, if any
+def build_model(vertices, elements, material, section, supports=(), loads=(), analysis=None, boundary_tags=None):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    timings = {}
+
+    # Boundary node sets are found once, every support and load selection then looks them up
+    with timed(timings, "boundary_index"):
+        index = BoundaryIndex(vertices, elements, boundary_tags)
+
+    build_domain(vertices, elements, material, section, timings)
+    apply_supports(vertices, supports, timings, index)
+    if loads:
+        apply_loads(vertices, loads, timings, elements=elements, thickness=section["thickness"], index=index)
+
+    analysis = {**DEFAULT_ANALYSIS, **(analysis or {})}
+    if analysis["algorithm"] == 'auto':
+        analysis["algorithm"] = 'Linear' if is_linear_elastic(material) else 'Newton'
+    if analysis["system"] == 'auto':
+        with timed(timings, "solver_selection"):
+            analysis["system"] = select_solver(vertices, elements)["system"]
+    setup_analysis(analysis, timings)
+
+    return timings
+
+
+# Function to check a Linear solve, which runs no convergence test: a singular stiffness (no supports, a node no
+# element connects) can still return displacements, so they must be finite and balance the applied loads at every
+# free DOF, displacements and reactions (N, 2) as read by results.node_results
+def check_linear_solution(displacements, reactions, tol=1e-6):
+    if not np.all(np.isfinite(displacements)):
+        raise RuntimeError("Linear solve gave non-finite displacements, check the supports and unconnected nodes.")
+
+    # After ops.reactions() the reaction of a free DOF is its out-of-balance force
+    free = np.ones(displacements.shape, dtype=bool)
+    for node in ops.getFixedNodes():
+        free[node - 1, np.asarray(ops.getFixedDOFs(node)) - 1] = False
+    applied = np.array([ops.nodeUnbalance(tag) for tag in range(1, len(displacements) + 1)])
+
+    residual = np.abs(reactions[free]).max(initial=0.0)
+    if residual > tol * np.abs(applied).max(initial=0.0):
+        raise RuntimeError(f"Linear solve is out of balance by {residual:.3g} at a free DOF, the stiffness matrix is "
+                           f"singular, check the supports and unconnected nodes.")
+
+
+# Function to build and analyse a model, returns the per-phase timings (raises if the analysis fails)
+def run_model(vertices, elements, material, section, supports=(), loads=(), analysis=None, boundary_tags=None):
+    timings = build_model(vertices, elements, material, section, supports, loads, analysis, boundary_tags)
+
+    analysis = {**DEFAULT_ANALYSIS, **(analysis or {})}
+    with timed(timings, "analyze"):
+        if ops.analyze(analysis["steps"]) != 0:
+            raise RuntimeError("Analysis failed to converge.")
+
+    # Newton runs its convergence test, the Linear path has to be checked afterwards
+    if analysis["algorithm"] == 'Linear' or (analysis["algorithm"] == 'auto' and is_linear_elastic(material)):
+        with timed(timings, "check"):
+            check_linear_solution(*node_results(len(vertices)))
+
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+# Function to solve a model with the Linear fast path and with Newton iterations, and report the time saved
+def compare_linear_path(vertices, elements, material, section, supports=(), loads=(), analysis=None,
+                        boundary_tags=None):
+    runs = {}
+    for algorithm in ('Newton', 'Linear'):
+        timings = run_model(vertices, elements, material, section, supports, loads,
+                            {**(analysis or {}), "algorithm": algorithm}, boundary_tags)
+        displacements, _ = node_results(len(vertices))
+        runs[algorithm] = (timings["analyze"], displacements)
+
+    newton_time, newton_disp = runs['Newton']
+    linear_time, linear_disp = runs['Linear']
+    scale = max(np.abs(newton_disp).max(), 1e-300)
+    return {
+        "newton": newton_time,
+        "linear": linear_time,
+        "saved": newton_time - linear_time,
+        "max_relative_difference": float(np.abs(newton_disp - linear_disp).max() / scale),
+    }
+
+
+# Function to print a Linear vs Newton comparison
+def print_linear_report(report):
+    print(f"Linear fast path: analyze {report['linear'] * 1000:.1f} ms vs Newton {report['newton'] * 1000:.1f} ms, "
+          f"saved {report['saved'] * 1000:.1f} ms (max relative difference {report['max_relative_difference']:.1e})")
+
+
+# Function to print per-phase timings
+def print_timings(timings):
+    for name, seconds in timings.items():
+        print(f"  {name}: {seconds * 1000:.1f} ms")
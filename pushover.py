@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import openseespy.opensees as ops
+
+from boundary_index import BoundaryIndex
+from model_builder import add_load_pattern, build_model, load_mesh, load_vector, timed
+
+# Algorithms tried in turn on a step that does not converge, each step starts again from the first
+FALLBACK_ALGORITHMS = ('Newton', 'ModifiedNewton', 'KrylovNewton')
+
+# Displacement control settings, missing keys fall back to these
+DEFAULT_PUSHOVER = {
+    "target": 0.03,  # Control displacement to reach
+    "step": 0.0005,  # First displacement increment
+    "min_step": None,  # Smallest increment before giving up (default step / 64)
+    "max_step": None,  # Largest increment (default 8 * step)
+    "adaptive": True,  # False keeps every increment at step, eg. 180 steps of 0.1 to reach 18
+    "target_iterations": 4,  # Steps taking fewer iterations grow the increment, steps taking more shrink it
+    "growth": 2.0,  # Largest increase of the increment from one step to the next
+    "shrink": 0.5,  # Largest decrease, also the cut after a step that does not converge
+    "test": ["NormDispIncr", 1.0e-8, 25],
+}
+
+
+# Function to pick the next displacement increment from the iterations the last converged step took, scaled by
+# target_iterations / iterations like the Jd option of the OpenSees DisplacementControl integrator
+def adapt_step(step, iterations, settings):
+    factor = np.clip(settings["target_iterations"] / max(iterations, 1), settings["shrink"], settings["growth"])
+    return float(np.clip(step * factor, settings["min_step"], settings["max_step"]))
+
+
+# Function to read the recorder values of the current step, recorders = [{"node": tag, "dof": 1,
+# "response": 'disp' | 'reaction'}, {"element": tag, "point": 1, "component": 0, "response": 'stressStrain'}]
+# (node reactions must be up to date, see ops.reactions)
+def read_recorders(recorders):
+    rows = []
+    for recorder in recorders:
+        response = recorder.get("response", 'disp')
+        if response == 'disp':
+            rows.append([ops.nodeDisp(recorder["node"], recorder.get("dof", 1))])
+        elif response == 'reaction':
+            rows.append([ops.nodeReaction(recorder["node"], recorder.get("dof", 1))])
+        elif response == 'stressStrain':
+            component = recorder.get("component", 0)
+            point = recorder.get("point", 1)
+            rows.append([ops.eleResponse(recorder["element"], 'material', point, 'stress')[component],
+                         ops.eleResponse(recorder["element"], 'material', point, 'strain')[component]])
+        else:
+            raise ValueError(f"Unsupported recorder response: {response}")
+    return rows
+
+
+# Function to name a recorder's output file like the OpenSees recorders in PushoverOut
+def recorder_file(recorder):
+    if "file" in recorder:
+        return recorder["file"]
+    if "element" in recorder:
+        return f"Ele{recorder['element']}Stress.out"
+    kind = {'disp': 'Disp', 'reaction': 'React'}[recorder.get("response", 'disp')]
+    return f"Node{recorder['node']}{kind}.out"
+
+
+# Function to push the model in the OpenSees domain to the target displacement of a control node under the load
+# pattern already defined (its load factor is the pushover force), returns the step history
+#   base_nodes: node tags whose reactions in dof are summed into the base shear
+# Every step tries the algorithms in FALLBACK_ALGORITHMS, a step none of them solves is retried with a smaller
+# increment, and the increment grows or shrinks with the iterations the last step needed
+def run_pushover(control_node, dof, settings=None, base_nodes=(), recorders=()):
+    settings = {**DEFAULT_PUSHOVER, **(settings or {})}
+    settings["min_step"] = settings["min_step"] or settings["step"] / 64
+    settings["max_step"] = settings["max_step"] or 8 * settings["step"]
+
+    ops.test(*settings["test"])
+    ops.analysis('Static')
+
+    history = {"displacement": [], "load_factor": [], "base_shear": [], "step": [], "iterations": [],
+               "algorithm": [], "attempts": [], "cuts": [], "seconds": [], "records": [[] for _ in recorders]}
+    target = settings["target"]
+    direction = np.sign(target)
+    step = abs(settings["step"])
+    status = "ok"
+    cuts = 0
+    t0 = time.perf_counter()
+
+    while True:
+        remaining = abs(target - ops.nodeDisp(control_node, dof))
+        if remaining <= 1e-9 * abs(target):
+            break
+        increment = min(step, remaining)
+
+        attempts = 0
+        for algorithm in FALLBACK_ALGORITHMS:
+            attempts += 1
+            ops.algorithm(algorithm)
+            ops.integrator('DisplacementControl', control_node, dof, direction * increment)
+            if ops.analyze(1) == 0:
+                break
+        else:
+            # OpenSees reverts a failed step to the last converged state, try again with a smaller increment
+            if step <= settings["min_step"]:
+                status = "failed"
+                print(f"Pushover stopped at {ops.nodeDisp(control_node, dof):.6g}: no convergence with an increment "
+                      f"of {increment:.3g}")
+                break
+            step = max(step * settings["shrink"], settings["min_step"])
+            cuts += 1
+            continue
+
+        iterations = ops.testIter()
+        history["seconds"].append(time.perf_counter() - t0)
+        history["displacement"].append(ops.nodeDisp(control_node, dof))
+        history["load_factor"].append(ops.getTime())
+        history["step"].append(increment)
+        history["iterations"].append(iterations)
+        history["algorithm"].append(algorithm)
+        history["attempts"].append(attempts)
+        history["cuts"].append(cuts)
+        ops.reactions()
+        for record, row in zip(history["records"], read_recorders(recorders)):
+            record.append(row)
+        history["base_shear"].append(-sum(ops.nodeReaction(node, dof) for node in base_nodes))
+
+        if settings["adaptive"]:
+            step = adapt_step(step, iterations, settings)
+        # The time of a step includes its failed attempts and increment cuts
+        cuts = 0
+        t0 = time.perf_counter()
+
+    history["status"] = status
+    return history
+
+
+# Function to write the recorder files (one line per step, like OpenSees file recorders) and pushover.json
+def write_pushover(directory, history, recorders):
+    os.makedirs(directory, exist_ok=True)
+    for recorder, record in zip(recorders, history["records"]):
+        np.savetxt(os.path.join(directory, recorder_file(recorder)), np.array(record), fmt='%.6g')
+
+    summary = {key: value for key, value in history.items() if key != "records"}
+    with open(os.path.join(directory, "pushover.json"), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+# Function to print the step count, fallbacks and timing of a pushover
+def print_pushover_report(history):
+    if not history["seconds"]:
+        print(f"Pushover {history['status']}: no converged steps")
+        return
+    seconds = np.array(history["seconds"])
+    fallbacks = sum(algorithm != FALLBACK_ALGORITHMS[0] for algorithm in history["algorithm"])
+    print(f"Pushover {history['status']}: {len(seconds)} steps to {history['displacement'][-1]:.6g}, "
+          f"peak base shear {max(history['base_shear'], key=abs):.6g}")
+    print(f"  steps {min(history['step']):.3g} to {max(history['step']):.3g}, "
+          f"{sum(history['iterations'])} iterations, {fallbacks} steps needed a fallback algorithm, "
+          f"{sum(history['cuts'])} increment cuts")
+    print(f"  {seconds.sum():.2f} s, {seconds.mean() * 1000:.1f} ms per step (slowest {seconds.max() * 1000:.1f} ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Displacement controlled pushover of a plane stress wall.")
+    parser.add_argument("mesh", nargs='?', help="mesh file, a structured 8 x 3 quad wall when left out")
+    parser.add_argument("--mesh-size", type=float, default=0.25, help="structured wall mesh size")
+    parser.add_argument("--target", type=float, default=DEFAULT_PUSHOVER["target"], help="top displacement")
+    parser.add_argument("--step", type=float, default=DEFAULT_PUSHOVER["step"], help="first increment")
+    parser.add_argument("--fixed-step", action='store_true', help="keep every increment at --step")
+    parser.add_argument("-o", "--output", default="pushover_results", help="output directory")
+    args = parser.parse_args(argv)
+
+    boundary_tags = None
+    if args.mesh:
+        vertices, elements, boundary_tags = load_mesh(args.mesh, boundary_tags=True)
+    else:
+        from structured_mesher import mesh_plate
+        vertices, elements = mesh_plate(8.0, 3.0, args.mesh_size)
+        vertices = vertices[:, :2]
+
+    # Steel plate wall in kN and m, fixed at the base, self-weight first, then pushed sideways along the top edge
+    material = {"type": 'J2Plasticity', "E": 200.0e6, "nu": 0.3, "fy": 250.0e3, "H": 2.0e6}
+    section = {"thickness": 0.01, "type": 'PlaneStress'}
+    supports = [{"where": "bottom", "dofs": [1, 1]}]
+    gravity = [{"type": "body", "by": -78.5}]
+    lateral = [{"type": "line", "where": "top", "qx": 1.0, "total": True}]
+
+    timings = build_model(vertices, elements, material, section, supports, gravity,
+                          {"algorithm": 'Newton', "test": DEFAULT_PUSHOVER["test"], "integrator": ['LoadControl', 1.0]},
+                          boundary_tags)
+    with timed(timings, "gravity"):
+        if ops.analyze(1) != 0:
+            raise RuntimeError("Gravity analysis failed to converge.")
+        ops.loadConst('-time', 0.0)
+
+    index = BoundaryIndex(vertices, elements, boundary_tags)
+    add_load_pattern(load_vector(vertices, lateral, elements, section["thickness"], index), pattern_tag=2)
+
+    # Recorders like PushoverOut: top corner displacement, base corner reaction, stress-strain at the base corner
+    top = index.select("top")
+    bottom = index.select("bottom")
+    control = int(top[np.argmax(vertices[top, 0])]) + 1
+    base = int(bottom[np.argmin(vertices[bottom, 0])]) + 1
+    corner_element = int(np.flatnonzero((elements == base - 1).any(axis=1))[0]) + 1
+    recorders = [{"node": control, "dof": 1, "response": 'disp'},
+                 {"node": base, "dof": 1, "response": 'reaction'},
+                 {"element": corner_element, "point": 1, "component": 1, "response": 'stressStrain'}]
+
+    print(f"{len(vertices)} nodes, {len(elements)} elements, control node {control}")
+    history = run_pushover(control, 1, {"target": args.target, "step": args.step, "adaptive": not args.fixed_step},
+                           base_nodes=(bottom + 1).tolist(), recorders=recorders)
+    write_pushover(args.output, history, recorders)
+    print_pushover_report(history)
+    return 0 if history["status"] == "ok" else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
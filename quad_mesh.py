@@ -1,12 +1,20 @@
-import os
 import sys
 import numpy as np
-import meshio
-from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout
+from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QPushButton, QProgressBar, \
+    QCheckBox, QLabel, QLineEdit, QComboBox
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
-import gmsh
 
+from gmsh_mesher import mesh_plate, write_msh
+from boundary_index import BoundaryIndex
+from higher_order import elevate_order
+from mesh_cache import MeshCache
+from mesh_io import write_mesh
+from mesh_plot import MeshPreview
+from mesh_quality import improve_mesh, print_quality
+from mesh_worker import MeshJobManager, Debouncer
+from renumber import renumber_mesh, print_report
+from structured_mesher import mesh_plate as structured_mesh_plate
 from ui_main import Ui_MainWindow
 
 class MainWindow(QMainWindow):
@@ -50,73 +58,93 @@ class MainWindow(QMainWindow):
         self.mesh_vertices = None
         self.mesh_elements = None
 
+        # On-disk cache of previously generated meshes
+        self.mesh_cache = MeshCache()
+
+        # Vectorized mesh preview
+        self.mesh_preview = MeshPreview(self.ax)
+
         # Connect the ToggleHoleBtn clicked signal to toggle_hole method
         self.ui.toggleHoleBtn.clicked.connect(self.toggle_hole)
 
         # Default hole state
         self.hole_enabled = False
 
+        # Export button, the mesh is only written to disk when explicitly requested
+        self.export_mesh_btn = QPushButton("Export Mesh")
+        self.export_mesh_btn.clicked.connect(self.export_mesh)
+        self.ui.verticalLayout_14.addWidget(self.export_mesh_btn)
+
+        # Background meshing, the canvas is only updated when a result arrives
+        self.mesh_jobs = MeshJobManager(self)
+        self.mesh_jobs.result_ready.connect(self.show_mesh)
+        self.mesh_jobs.busy_changed.connect(self.update_mesh_busy)
+        self.mesh_jobs.error.connect(self.report_mesh_error)
+
+        # Busy indicator only, the mesher gives no progress to report
+        self.mesh_progress = QProgressBar()
+        self.mesh_progress.setRange(0, 1)
+        self.mesh_progress.setValue(0)
+        self.mesh_progress.setTextVisible(False)
+        self.ui.verticalLayout_14.addWidget(self.mesh_progress)
+
+        # A running mesh cannot be interrupted, the button only throws its result away
+        self.cancel_mesh_btn = QPushButton("Discard Mesh")
+        self.cancel_mesh_btn.setToolTip("Ignore the result of the mesh being generated")
+        self.cancel_mesh_btn.setEnabled(False)
+        self.cancel_mesh_btn.clicked.connect(self.discard_mesh)
+        self.ui.verticalLayout_14.addWidget(self.cancel_mesh_btn)
+
+        # Opt-in live preview, re-meshes once the inputs stop changing
+        self.last_mesh_params = None
+        self.live_preview = Debouncer(self.live_update, parent=self)
+        self.live_preview_check = QCheckBox("Live Preview")
+        self.live_preview_check.toggled.connect(self.toggle_live_preview)
+        self.ui.verticalLayout_14.addWidget(self.live_preview_check)
+
+        self.mesh_info_label = QLabel("")
+        self.ui.verticalLayout_14.addWidget(self.mesh_info_label)
+
+        # Element order of the exported mesh, the preview always shows the linear mesh
+        self.element_order = 1
+        self.lagrange = False  # 9-node instead of 8-node quads
+        self.element_order_input = QComboBox()
+        self.element_order_input.addItems(["Linear", "Quadratic (tri6/quad8)", "Quadratic (tri6/quad9)"])
+        self.element_order_input.currentIndexChanged.connect(self.update_element_order)
+        self.ui.verticalLayout_14.addWidget(self.element_order_input)
+
+        # Graded mesh, refined towards the opening corners, fixed (left/right) and loaded (top) edges
+        self.grading_enabled = False
+        self.grading_fine_size = None  # Defaults to mesh size / 4
+        self.grading_distance = None  # Defaults to 4 x mesh size
+
+        self.graded_mesh_check = QCheckBox("Graded Mesh")
+        self.graded_mesh_check.toggled.connect(self.toggle_grading)
+        self.ui.verticalLayout_21.addWidget(self.graded_mesh_check)
+
+        self.fine_size_input = QLineEdit()
+        self.fine_size_input.setPlaceholderText("Fine Size")
+        self.fine_size_input.textChanged.connect(self.update_fine_size)
+        self.ui.verticalLayout_21.addWidget(self.fine_size_input)
+
+        self.grading_distance_input = QLineEdit()
+        self.grading_distance_input.setPlaceholderText("Transition Distance")
+        self.grading_distance_input.textChanged.connect(self.update_grading_distance)
+        self.ui.verticalLayout_21.addWidget(self.grading_distance_input)
+
     def toggle_hole(self):
+        # The opening is built directly in the gmsh model on the next mesh generation
         self.hole_enabled = not self.hole_enabled
-        if self.hole_enabled:
-            # Add code to generate the hole
-            with open('rectangle.geo', 'w') as f:
-                f.write(f"lc = {self.mesh_size};\n")
-                f.write(f"width = {self.plate_geometry[0]};\n")
-                f.write(f"length = {self.plate_geometry[1]};\n\n")
-                f.write("Point(1) = {0, 0, 0, lc};\n")
-                f.write("Point(2) = {width, 0, 0, lc};\n")
-                f.write("Point(3) = {width, length, 0, lc};\n")
-                f.write("Point(4) = {0, length, 0, lc};\n\n")
-                f.write("Line(1) = {1, 2};\n")
-                f.write("Line(2) = {2, 3};\n")
-                f.write("Line(3) = {3, 4};\n")
-                f.write("Line(4) = {4, 1};\n\n")
-                f.write("Line Loop(5) = {1, 2, 3, 4};\n")
-                f.write("Mesh.Algorithm = 8;\n")
-                f.write("Plane Surface(6) = {5};\n")
-
-                # Additional lines to define the hole
-                f.write("\n")
-                f.write("inner_width = 1.0;\n")
-                f.write("inner_length = 1.0;\n\n")
-                f.write("Point(5) = {(width - inner_width) / 2, (length - inner_length) / 2, 0, lc};\n")
-                f.write("Point(6) = {(width + inner_width) / 2, (length - inner_length) / 2, 0, lc};\n")
-                f.write("Point(7) = {(width + inner_width) / 2, (length + inner_length) / 2, 0, lc};\n")
-                f.write("Point(8) = {(width - inner_width) / 2, (length + inner_length) / 2, 0, lc};\n\n")
-                f.write("Line(5) = {5, 6};\n")
-                f.write("Line(6) = {6, 7};\n")
-                f.write("Line(7) = {7, 8};\n")
-                f.write("Line(8) = {8, 5};\n\n")
-                f.write("Line Loop(9) = {5, 6, 7, 8};\n")
-                f.write("Plane Surface(10) = {9};\n")
-                f.write("Recombine Surface {6, 10};\n")
-        else:
-            # Remove the hole and regenerate the geometry without it
-            with open('rectangle_opening.geo', 'w') as f:
-                f.write(f"lc = {self.mesh_size};\n")
-                f.write(f"width = {self.plate_geometry[0]};\n")
-                f.write(f"length = {self.plate_geometry[1]};\n\n")
-                f.write("Point(1) = {0, 0, 0, lc};\n")
-                f.write("Point(2) = {width, 0, 0, lc};\n")
-                f.write("Point(3) = {width, length, 0, lc};\n")
-                f.write("Point(4) = {0, length, 0, lc};\n\n")
-                f.write("Line(1) = {1, 2};\n")
-                f.write("Line(2) = {2, 3};\n")
-                f.write("Line(3) = {3, 4};\n")
-                f.write("Line(4) = {4, 1};\n\n")
-                f.write("Line Loop(5) = {1, 2, 3, 4};\n")
-                f.write("Mesh.Algorithm = 8;\n")
-                f.write("Plane Surface(6) = {5};\n")
-                f.write("Recombine Surface {6};\n")
 
         # Update the plate rendering
         self.plot_plate()
+        self.schedule_live_update()
 
     def update_width(self, text):
         try:
             self.plate_geometry[0] = float(text)
             print("Width Updated with: " + str(self.plate_geometry[0]))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -124,6 +152,7 @@ class MainWindow(QMainWindow):
         try:
             self.plate_geometry[1] = float(text)
             print("Length Updated with: " + str(self.plate_geometry[1]))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -131,6 +160,7 @@ class MainWindow(QMainWindow):
         try:
             self.plate_geometry[2] = float(text)
             print("Thickness Updated with: " + str(self.plate_geometry[2]))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -138,6 +168,27 @@ class MainWindow(QMainWindow):
         try:
             self.mesh_size = float(text)
             print("Mesh Size Updated with: " + str(self.mesh_size))
+            self.schedule_live_update()
+        except ValueError:
+            pass
+
+    def toggle_grading(self, enabled):
+        self.grading_enabled = enabled
+        self.schedule_live_update()
+
+    def update_fine_size(self, text):
+        try:
+            self.grading_fine_size = float(text) if text.strip() else None
+            print("Fine Size Updated with: " + str(self.grading_fine_size))
+            self.schedule_live_update()
+        except ValueError:
+            pass
+
+    def update_grading_distance(self, text):
+        try:
+            self.grading_distance = float(text) if text.strip() else None
+            print("Transition Distance Updated with: " + str(self.grading_distance))
+            self.schedule_live_update()
         except ValueError:
             pass
 
@@ -148,6 +199,13 @@ class MainWindow(QMainWindow):
         elif index == 1:  # Quad mesh
             self.mesh_type = 'quad'
 
+        self.schedule_live_update()
+
+    def update_element_order(self, index):
+        self.element_order = 1 if index == 0 else 2
+        self.lagrange = index == 2
+        print("Element Order Updated with: " + str(self.element_order))
+
     def plot_plate(self):
         width = self.plate_geometry[0]
         length = self.plate_geometry[1]
@@ -163,115 +221,122 @@ class MainWindow(QMainWindow):
 
         self.canvas.draw()
 
+    def mesh_params(self):
+        grading = None
+        if self.grading_enabled:
+            grading = {"fine_size": self.grading_fine_size, "distance": self.grading_distance}
+        return {"mesher": "gmsh", "width": self.plate_geometry[0], "length": self.plate_geometry[1],
+                "mesh_size": self.mesh_size, "mesh_type": self.mesh_type, "hole_enabled": self.hole_enabled,
+                "grading": grading}
+
     def generate_mesh(self):
         print("Generating mesh...")
+        params = self.mesh_params()
+        width = params["width"]
+        length = params["length"]
+        mesh_size = params["mesh_size"]
+        hole = params["hole_enabled"]
+        recombine = params["mesh_type"] == 'quad'
+        grading = params["grading"]
+
+        # Every job returns its parameters with the mesh, they become last_mesh_params once the mesh is shown
+        if not hole and grading is None:
+            # Plain rectangle, a structured grid is built directly in NumPy
+            element_type = 'quad' if recombine else 'triangle'
+            self.mesh_jobs.submit(
+                lambda: (structured_mesh_plate(width, length, mesh_size, element_type=element_type), params))
+            return
+
+        # Mesh the plate in memory with the gmsh API, reusing a cached mesh when possible
+        self.mesh_jobs.submit(
+            lambda: (self.mesh_cache.fetch(
+                params, lambda: mesh_plate(width, length, mesh_size, hole=hole, recombine=recombine,
+                                           grading=grading)), params))
+
+    def show_mesh(self, result):
+        (self.mesh_vertices, self.mesh_elements), self.last_mesh_params = result
         width = self.plate_geometry[0]
         length = self.plate_geometry[1]
-        mesh_size = self.mesh_size
-
-        # Clear previous mesh
-        self.ax.clear()
-
-        # Create rectangle.geo file for mesh generation
-        with open('rectangle.geo', 'w') as f:
-            f.write(f"lc = {mesh_size};\n")
-            f.write(f"width = {width};\n")
-            f.write(f"length = {length};\n\n")
-            f.write("Point(1) = {0, 0, 0, lc};\n")
-            f.write("Point(2) = {width, 0, 0, lc};\n")
-            f.write("Point(3) = {width, length, 0, lc};\n")
-            f.write("Point(4) = {0, length, 0, lc};\n\n")
-            f.write("Line(1) = {1, 2};\n")
-            f.write("Line(2) = {2, 3};\n")
-            f.write("Line(3) = {3, 4};\n")
-            f.write("Line(4) = {4, 1};\n\n")
-            f.write("Line Loop(5) = {1, 2, 3, 4};\n")
-            f.write("Mesh.Algorithm = 8;\n")
-            f.write("Plane Surface(6) = {5};\n")
-            f.write("Recombine Surface {6};\n")
-
-        # Import and mesh the geometry using Gmsh
-        gmsh.initialize()
-        gmsh.open('rectangle.geo')
-        gmsh.option.setNumber("Mesh.CharacteristicLengthMin", mesh_size)
-        gmsh.model.geo.synchronize()
-        gmsh.model.mesh.generate(2)
-        gmsh.write('rectangle.msh')
-        gmsh.finalize()
-
-        # Load the generated mesh
-        mesh = meshio.read('rectangle.msh')
-
-        # Extract vertices and cells from the mesh
-        self.mesh_vertices = mesh.points
-        self.mesh_elements = None
-        for cell_block in mesh.cells:
-            if cell_block.type == 'quad':
-                self.mesh_elements = cell_block.data
-                break
-        if self.mesh_elements is None:
-            for cell_block in mesh.cells:
-                if cell_block.type == 'triangle':
-                    self.mesh_elements = cell_block.data
-                    break
-        if self.mesh_elements is None:
-            raise ValueError("No quadrilateral or triangular cells found in the mesh.")
 
         # Plot mesh
-        for element in self.mesh_elements:
-            if len(element) == 4:  # Quad element
-                x = [self.mesh_vertices[node][0] for node in element]
-                y = [self.mesh_vertices[node][1] for node in element]
-                x.append(x[0])  # Close the loop
-                y.append(y[0])  # Close the loop
-                self.ax.plot(x, y, 'k-', linewidth=0.5)  # Black lines
-
-                # Fill quads with blue color
-                x_quad = [self.mesh_vertices[node][0] for node in element]
-                y_quad = [self.mesh_vertices[node][1] for node in element]
-                self.ax.fill(x_quad, y_quad, color='blue', alpha=0.3)  # Blue fill, with some transparency
-            elif len(element) == 3:  # Triangle element
-                x = [self.mesh_vertices[node][0] for node in element]
-                y = [self.mesh_vertices[node][1] for node in element]
-                x.append(x[0])  # Close the loop
-                y.append(y[0])  # Close the loop
-                self.ax.plot(x, y, 'k-', linewidth=0.5)  # Black lines
-
-                # Fill triangles with blue color
-                x_tri = [self.mesh_vertices[node][0] for node in element]
-                y_tri = [self.mesh_vertices[node][1] for node in element]
-                self.ax.fill(x_tri, y_tri, color='blue', alpha=0.3)  # Blue fill, with some transparency
+        self.mesh_preview.draw(self.mesh_vertices, self.mesh_elements)
 
         # Set plot limits
         self.ax.set_xlim(0, width)
         self.ax.set_ylim(0, length)
 
         # Update canvas to reflect the changes
-        self.canvas.draw()
-
-        # Optionally, clean up the intermediate .geo and .msh files
-        # os.remove('rectangle.geo')
-        # os.remove('rectangle.msh')
+        self.canvas.draw_idle()
+        self.mesh_info_label.setText(f"{len(self.mesh_elements)} elements, {len(self.mesh_vertices)} nodes")
 
         print("Mesh generation complete")
 
+    def update_mesh_busy(self, busy):
+        self.cancel_mesh_btn.setEnabled(busy)
+
+        # A (0, 0) range shows Qt's indeterminate busy animation
+        self.mesh_progress.setRange(0, 0 if busy else 1)
+
+    def report_mesh_error(self, message):
+        # The live preview retries the same parameters after a failure
+        self.last_mesh_params = None
+        print("Mesh generation failed:\n" + message)
+
+    def discard_mesh(self):
+        self.mesh_jobs.cancel()
+        self.last_mesh_params = None
+
+    def toggle_live_preview(self, enabled):
+        if enabled:
+            self.schedule_live_update()
+        else:
+            self.live_preview.cancel()
+
+    def schedule_live_update(self):
+        if self.live_preview_check.isChecked():
+            self.live_preview.trigger()
+
+    def live_update(self):
+        params = self.mesh_params()
+        if params["width"] <= 0 or params["length"] <= 0 or params["mesh_size"] <= 0:
+            return
+
+        # Only re-mesh when a value that affects the mesh has actually changed
+        if params == self.last_mesh_params:
+            return
+
+        self.generate_mesh()
+
+    def export_mesh(self):
+        if self.mesh_elements is None:
+            print("No mesh to export, generate a mesh first")
+            return
+
+        # Binary mesh read by op_quad_model.py & cantilever_quads.py, plus a .msh copy for gmsh
+        vertices, elements, boundary = self.export_mesh_data('rectangle.feamesh')
+        write_msh('rectangle.msh', vertices, elements, boundary)
+        print("Mesh exported to rectangle.feamesh and rectangle.msh")
+
     def export_mesh_data(self, filename):
-        with open(filename, 'w') as file:
-            # Write node coordinates
-            file.write("## Node coordinates\n")
-            for i, vertex in enumerate(self.mesh_vertices):
-                file.write(f"node {i + 1} {vertex[0]} {vertex[1]} {vertex[2]}\n")
-
-            # Write element connectivity
-            file.write("\n## Element connectivity\n")
-            for i, element in enumerate(self.mesh_elements):
-                if len(element) == 4:
-                    file.write(f"element quad4 {i + 1} {' '.join(str(node) for node in element)}\n")
-                else:
-                    raise ValueError("Elements with more than four nodes are not supported.")
+        # Smooth distorted elements before writing
+        vertices, before, after = improve_mesh(self.mesh_vertices, self.mesh_elements)
+        print_quality(before, after)
 
-        print("Mesh file generated")
+        # Add midside (and centre) nodes for quadratic elements
+        elements = self.mesh_elements
+        if self.element_order == 2:
+            vertices, elements = elevate_order(vertices, elements, lagrange=self.lagrange)
+
+        # Renumber nodes to reduce the stiffness matrix bandwidth/profile
+        vertices, elements, report = renumber_mesh(vertices, elements)
+        print_report(report)
 
+        # Write node coordinates, element connectivity and the boundary edge groups to the binary mesh container
+        boundary = BoundaryIndex(vertices, elements)
+        write_mesh(filename, vertices, elements, boundary_tags=boundary.boundary_tags())
+
+        print("Mesh file generated")
+        return vertices, elements, boundary
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,216 @@
+import argparse
+import copy
+import sys
+import time
+
+import numpy as np
+import openseespy.opensees as ops
+
+from boundary_index import BoundaryIndex
+from model_builder import (DEFAULT_ANALYSIS, MATERIAL_TAG, add_elements, add_load_pattern, add_material,
+                           apply_supports, build_domain, check_linear_solution, is_linear_elastic, load_mesh,
+                           load_vector, material_values, run_model, setup_analysis, timed)
+from results import node_results
+from solver_select import select_solver
+
+# Material values the elements accept through setParameter, changed in place on every element's material copy
+# (the quad and triangle elements take no 'thickness' parameter, a section change re-creates the elements)
+MATERIAL_PARAMETERS = ('E', 'nu', 'rho')
+
+
+# Model kept in the OpenSees domain between analyses: update() changes only the loads, material values or section
+# that differ from the previous analysis and solves from the previous converged displacements (warm start), the
+# report lists what each analysis rebuilt and the time saved against the first (cold) build and solve
+class ReanalysisModel:
+    def __init__(self, vertices, elements, material, section, supports=(), loads=(), analysis=None,
+                 boundary_tags=None):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.elements = np.asarray(elements)
+        self.material = copy.deepcopy(material)
+        self.section = copy.deepcopy(section)
+        self.loads = copy.deepcopy(list(loads))
+        self.reports = []
+
+        timings = {}
+        with timed(timings, "boundary_index"):
+            self.index = BoundaryIndex(self.vertices, self.elements, boundary_tags)
+
+        build_domain(self.vertices, self.elements, self.material, self.section, timings)
+        apply_supports(self.vertices, supports, timings, self.index)
+        self.material_tag = MATERIAL_TAG
+        self.tagged_material = self.material
+
+        with timed(timings, "loads"):
+            self.forces = self.load_forces(self.loads, self.section)
+            self.pattern_tag = 1
+            add_load_pattern(self.forces, self.pattern_tag, series='Constant')
+
+        self.analysis = {**DEFAULT_ANALYSIS, **(analysis or {})}
+        if self.analysis["algorithm"] == 'auto':
+            self.analysis["algorithm"] = 'Linear' if is_linear_elastic(self.material) else 'Newton'
+        if self.analysis["system"] == 'auto':
+            with timed(timings, "solver_selection"):
+                self.analysis["system"] = select_solver(self.vertices, self.elements)["system"]
+        setup_analysis({**self.analysis, "integrator": ['LoadControl', 1]}, timings)
+        self.set_algorithm()
+
+        self.solve(timings)
+        self.cold_time = sum(timings.values())
+        self.reports.append({"rebuilt": ["domain"], "updated": [], "timings": timings,
+                             "iterations": self.iterations, "total": self.cold_time, "saved": 0.0})
+
+    # Function to sum the load specs into nodal forces for a section (body and pressure loads use its thickness)
+    def load_forces(self, loads, section):
+        return load_vector(self.vertices, loads, self.elements, section["thickness"], self.index)
+
+    # Function to (re)issue the solution algorithm, a new Linear algorithm factorizes the stiffness on its first
+    # step and keeps that factorization until the stiffness changes
+    def set_algorithm(self):
+        if self.analysis["algorithm"] == 'Linear':
+            ops.algorithm('Linear', '-factorOnce')
+        else:
+            ops.algorithm(self.analysis["algorithm"])
+
+    # Function to run one analysis step from the current (previous converged) displacements and read the new ones
+    # The Constant series applies the full load whatever pseudo-time the previous analyses advanced to
+    def solve(self, timings):
+        with timed(timings, "solve"):
+            if ops.analyze(1) != 0:
+                raise RuntimeError("Reanalysis failed to converge.")
+        with timed(timings, "results"):
+            self.displacements, reactions = node_results(len(self.vertices))
+        if self.analysis["algorithm"] == 'Linear':
+            with timed(timings, "check"):
+                check_linear_solution(self.displacements, reactions)
+        self.iterations = ops.testIter() if self.analysis["algorithm"] != 'Linear' else 1
+
+    # Function to reanalyse with new material values, section or loads (None keeps the current ones), returns the
+    # nodal displacements (N, 2)
+    def update(self, material=None, section=None, loads=None):
+        material = self.material if material is None else copy.deepcopy(material)
+        section = self.section if section is None else copy.deepcopy(section)
+        loads = self.loads if loads is None else copy.deepcopy(list(loads))
+        timings = {}
+        rebuilt = []
+        updated = []
+
+        # Values left out compare as the defaults the material was built with, eg. no rho and rho 0.0 are the same
+        values = material_values(material)
+        previous = material_values(self.material)
+        changed = {key for key in set(values) | set(previous) if values.get(key) != previous.get(key)}
+        if changed - set(MATERIAL_PARAMETERS):
+            raise ValueError(f"Material {', '.join(sorted(changed - set(MATERIAL_PARAMETERS)))} cannot be changed "
+                             f"in place, build a new model instead.")
+        stiffness_changed = bool(changed) or section != self.section
+
+        if section != self.section:
+            rebuilt.append("elements")
+            with timed(timings, "elements"):
+                remove = ops.remove
+                for tag in range(1, len(self.elements) + 1):
+                    remove('element', tag)
+
+            # The elements copy their material when created, values set in place on the old elements only reach
+            # the new ones through a new material
+            if values != material_values(self.tagged_material):
+                rebuilt.append("material")
+                self.material_tag += 1
+                add_material(material, timings, self.material_tag)
+                self.tagged_material = material
+            add_elements(self.elements, section, timings, self.material_tag)
+        elif changed:
+            with timed(timings, "materials"):
+                for key in sorted(changed):
+                    ops.setParameter('-val', values[key], '-eleRange', 1, len(self.elements), key)
+            updated.extend(sorted(changed))
+
+        if loads != self.loads or section["thickness"] != self.section["thickness"]:
+            with timed(timings, "loads"):
+                forces = self.load_forces(loads, section)
+                if not np.array_equal(forces, self.forces):
+                    ops.remove('loadPattern', self.pattern_tag)
+                    self.pattern_tag += 1
+                    add_load_pattern(forces, self.pattern_tag, series='Constant')
+                    self.forces = forces
+                    rebuilt.append("loads")
+
+        # A changed stiffness needs a new factorization, a load change alone is a back-substitution
+        if stiffness_changed:
+            with timed(timings, "analysis_setup"):
+                self.set_algorithm()
+            rebuilt.append("factorization")
+
+        self.material, self.section, self.loads = material, section, loads
+        self.solve(timings)
+
+        total = sum(timings.values())
+        self.reports.append({"rebuilt": rebuilt, "updated": updated, "timings": timings,
+                             "iterations": self.iterations, "total": total, "saved": self.cold_time - total})
+        return self.displacements
+
+    # Function to print what every analysis rebuilt and the time saved against the first, cold analysis
+    def print_report(self):
+        for count, report in enumerate(self.reports):
+            rebuilt = ", ".join(report["rebuilt"]) or "nothing"
+            updated = f", updated {', '.join(report['updated'])} in place" if report["updated"] else ""
+            print(f"  analysis {count}: rebuilt {rebuilt}{updated}, {report['iterations']} iteration(s), "
+                  f"{report['total'] * 1000:.1f} ms, saved {report['saved'] * 1000:.1f} ms")
+        saved = sum(report["saved"] for report in self.reports)
+        print(f"  reuse saved {saved:.2f} s over {len(self.reports) - 1} reanalyses")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare warm-started reanalysis with rebuilding the model.")
+    parser.add_argument("mesh", nargs='?', help="mesh file, a structured 8 x 3 quad wall when left out")
+    parser.add_argument("--mesh-size", type=float, default=0.25, help="structured wall mesh size")
+    parser.add_argument("--element-type", default='quad', choices=('quad', 'triangle'))
+    args = parser.parse_args(argv)
+
+    boundary_tags = None
+    if args.mesh:
+        vertices, elements, boundary_tags = load_mesh(args.mesh, boundary_tags=True)
+    else:
+        from structured_mesher import mesh_plate
+        vertices, elements = mesh_plate(8.0, 3.0, args.mesh_size, element_type=args.element_type)
+        vertices = vertices[:, :2]
+
+    # Wall of op_quad_model.py, then a series of changes each applied on top of the previous ones
+    material = {"E": 30100.0, "nu": 0.2}
+    section = {"thickness": 350.0, "type": 'PlaneStress'}
+    supports = [{"where": "ends", "dofs": [1, 1]}]
+    loads = [{"type": "line", "where": "top", "qy": -1500.0}]
+
+    changes = [
+        ("load x 1.5", {"loads": [{**loads[0], "qy": -2250.0}]}),
+        ("self-weight added", {"loads": [{**loads[0], "qy": -2250.0}, {"type": "body", "by": -0.025}]}),
+        ("E = 25000", {"material": {**material, "E": 25000.0}}),
+        ("thickness = 250", {"section": {**section, "thickness": 250.0}}),
+        ("E = 35000, thickness = 200", {"material": {**material, "E": 35000.0},
+                                        "section": {**section, "thickness": 200.0}}),
+    ]
+
+    print(f"Mesh: {len(vertices)} nodes, {len(elements)} elements")
+    model = ReanalysisModel(vertices, elements, material, section, supports, loads, boundary_tags=boundary_tags)
+
+    # The cold rebuild of each step uses the model state after it
+    warm = []
+    for name, change in changes:
+        displacements = model.update(**change)
+        warm.append((name, displacements, model.material, model.section, model.loads))
+
+    print("Cold rebuilds:")
+    for name, displacements, step_material, step_section, step_loads in warm:
+        t0 = time.perf_counter()
+        run_model(vertices, elements, step_material, step_section, supports, step_loads, boundary_tags=boundary_tags)
+        cold, _ = node_results(len(vertices))
+        scale = max(np.abs(cold).max(), 1e-300)
+        print(f"  {name}: {(time.perf_counter() - t0) * 1000:.1f} ms, "
+              f"max relative difference {np.abs(displacements - cold).max() / scale:.1e}")
+
+    print("Reanalysis:")
+    model.print_report()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
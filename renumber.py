@@ -0,0 +1,104 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+# Number of leading nodes kept in place, the plate corners (the cantilever examples fix/load nodes 1-4)
+PINNED_NODES = 4
+
+
+# Function to build the symmetric node adjacency graph from element connectivity
+def node_graph(elements, n_nodes):
+    elements = np.asarray(elements)
+    nodes_per_element = elements.shape[1]
+
+    # Every pair of nodes in an element is coupled in the stiffness matrix
+    i, j = np.meshgrid(np.arange(nodes_per_element), np.arange(nodes_per_element), indexing='ij')
+    rows = elements[:, i.ravel()].ravel()
+    cols = elements[:, j.ravel()].ravel()
+
+    data = np.ones(len(rows), dtype=np.int8)
+    graph = sp.coo_matrix((data, (rows, cols)), shape=(n_nodes, n_nodes)).tocsr()
+    graph.data[:] = 1
+    return graph
+
+
+# Function to compute the (node) bandwidth and skyline profile of a graph
+def bandwidth_profile(graph):
+    coo = graph.tocoo()
+    bandwidth = int(np.abs(coo.row - coo.col).max()) if coo.nnz else 0
+
+    # Profile: for each row, distance from the first non-zero in the lower triangle to the diagonal
+    first = np.arange(graph.shape[0])
+    lower = coo.col < coo.row
+    np.minimum.at(first, coo.row[lower], coo.col[lower])
+    profile = int((np.arange(graph.shape[0]) - first).sum())
+
+    return bandwidth, profile
+
+
+# Function to convert a node bandwidth/profile into the equation (DOF) bandwidth/profile of the stiffness matrix,
+# with the ndf DOFs of each node numbered consecutively
+def dof_bandwidth_profile(bandwidth, profile, n_nodes, ndf=2):
+    return ndf * bandwidth + ndf - 1, ndf * ndf * profile + n_nodes * ndf * (ndf - 1) // 2
+
+
+# Function to compute a bandwidth-reducing node order, returns the old node index for each new position
+def node_order(elements, n_nodes, method='rcm', pinned=PINNED_NODES):
+    if method == 'none':
+        return np.arange(n_nodes)
+    if method != 'rcm':
+        raise ValueError(f"Unsupported renumbering method: {method}")
+
+    pinned = min(pinned, n_nodes)
+    graph = node_graph(elements, n_nodes)
+
+    # Reverse Cuthill-McKee on the free nodes only, pinned nodes keep their ids
+    free = np.arange(pinned, n_nodes)
+    sub_graph = graph[free][:, free]
+    free_order = free[reverse_cuthill_mckee(sub_graph, symmetric_mode=True)]
+
+    return np.concatenate([np.arange(pinned), free_order])
+
+
+# Function to renumber mesh arrays, returns the renumbered arrays and a before/after report
+def renumber_mesh(vertices, elements, method='rcm', pinned=PINNED_NODES):
+    vertices = np.asarray(vertices)
+    elements = np.asarray(elements)
+    n_nodes = len(vertices)
+
+    order = node_order(elements, n_nodes, method=method, pinned=pinned)
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(n_nodes)
+
+    new_vertices = vertices[order]
+    new_elements = new_index[elements]
+
+    before = bandwidth_profile(node_graph(elements, n_nodes))
+    after = bandwidth_profile(node_graph(new_elements, n_nodes))
+
+    # bandwidth/profile are node graph values, the equation_ values count the 2 DOFs of every node
+    equation_before = dof_bandwidth_profile(*before, n_nodes)
+    equation_after = dof_bandwidth_profile(*after, n_nodes)
+    report = {
+        "method": method,
+        "nodes": n_nodes,
+        "bandwidth_before": before[0],
+        "bandwidth_after": after[0],
+        "profile_before": before[1],
+        "profile_after": after[1],
+        "equation_bandwidth_before": equation_before[0],
+        "equation_bandwidth_after": equation_after[0],
+        "equation_profile_before": equation_before[1],
+        "equation_profile_after": equation_after[1],
+    }
+    return new_vertices, new_elements, report
+
+
+# Function to print a renumbering report
+def print_report(report):
+    # The profile is what the ProfileSPD skyline solver stores and factorizes
+    print(f"Node renumbering ({report['method']}, {report['nodes']} nodes)")
+    print(f"  node bandwidth:     {report['bandwidth_before']} -> {report['bandwidth_after']}")
+    print(f"  node profile:       {report['profile_before']} -> {report['profile_after']}")
+    print(f"  equation bandwidth: {report['equation_bandwidth_before']} -> {report['equation_bandwidth_after']}")
+    print(f"  equation profile:   {report['equation_profile_before']} -> {report['equation_profile_after']}")
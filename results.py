@@ -0,0 +1,73 @@
+from itertools import chain
+
+import numpy as np
+import openseespy.opensees as ops
+import scipy.sparse as sp
+
+from isoparametric import QUADRATURE, extrapolation_matrix
+from mesh_io import element_type_for
+
+# Columns of the nodal stress table, the same as opsvis.sig_out_per_node
+STRESS_COLUMNS = ('sxx', 'syy', 'sxy', 'von_mises', 's1', 's2', 'angle')
+
+
+# Function to pull a per-node (or per-element) response of every tag into one preallocated array (count, width)
+def _bulk_response(response, tags, width, *args):
+    values = chain.from_iterable(response(tag, *args) for tag in tags)
+    return np.fromiter(values, dtype=np.float64, count=len(tags) * width).reshape(len(tags), width)
+
+
+# Function to read the displacements and reactions (N, 2) of nodes 1..N from the OpenSees domain
+def node_results(n_nodes):
+    tags = range(1, n_nodes + 1)
+    ops.reactions()
+    return _bulk_response(ops.nodeDisp, tags, 2), _bulk_response(ops.nodeReaction, tags, 2)
+
+
+# Function to read the quadrature point stresses (M, g, 3) of elements 1..M from the OpenSees domain
+def gauss_stresses(elements):
+    n_points = len(QUADRATURE[element_type_for(elements)][1])
+    stresses = _bulk_response(ops.eleResponse, range(1, len(elements) + 1), 3 * n_points, 'stresses')
+    return stresses.reshape(len(elements), n_points, 3)
+
+
+# Function to build the sparse matrix (N, M * n) averaging element node values over the elements sharing each node
+def averaging_matrix(elements, n_nodes):
+    nodes = np.asarray(elements).ravel()
+    counts = np.bincount(nodes, minlength=n_nodes)
+    return sp.csr_matrix((1.0 / counts[nodes], (nodes, np.arange(len(nodes)))), shape=(n_nodes, len(nodes)))
+
+
+# Function to recover averaged nodal stresses (N, 3) from quadrature point stresses (M, g, 3): each element's
+# stresses are extrapolated to its nodes, then averaged over the elements sharing the node
+def nodal_stresses(elements, gauss, n_nodes, averaging=None):
+    if averaging is None:
+        averaging = averaging_matrix(elements, n_nodes)
+    at_nodes = np.einsum('ng,mgk->mnk', extrapolation_matrix(element_type_for(elements)), gauss)
+    return averaging @ at_nodes.reshape(-1, 3)
+
+
+# Function to add von Mises and principal stresses to plane stresses (..., 3): sxx, syy, sxy, von Mises, s1, s2,
+# principal angle (radians)
+def stress_invariants(stresses):
+    sxx, syy, sxy = np.moveaxis(np.asarray(stresses), -1, 0)
+
+    centre = (sxx + syy) / 2
+    radius = np.sqrt(((sxx - syy) / 2) ** 2 + sxy ** 2)
+    von_mises = np.sqrt(sxx ** 2 - sxx * syy + syy ** 2 + 3 * sxy ** 2)
+    angle = np.arctan2(sxy, (sxx - syy) / 2) / 2
+    return np.stack([sxx, syy, sxy, von_mises, centre + radius, centre - radius, angle], axis=-1)
+
+
+# Function to collect the results of the current analysis as arrays: nodal displacements, reactions, quadrature
+# point stresses and the averaged nodal stress table (columns STRESS_COLUMNS)
+def collect_results(elements, n_nodes, averaging=None):
+    elements = np.asarray(elements)
+    displacements, reactions = node_results(n_nodes)
+    gauss = gauss_stresses(elements)
+    return {
+        "displacements": displacements,
+        "reactions": reactions,
+        "gauss_stresses": gauss,
+        "stresses": stress_invariants(nodal_stresses(elements, gauss, n_nodes, averaging)),
+    }
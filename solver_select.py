@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import openseespy.opensees as ops
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from renumber import bandwidth_profile, node_graph
+
+# Linear system solvers considered by the selection and the benchmark
+SYSTEMS = ('ProfileSPD', 'BandSPD', 'SparseSYM', 'UmfPack', 'Mumps')
+
+# Measured timings written by the benchmark and read back by select_solver
+BENCHMARK_FILE = 'solver_benchmark.json'
+
+# Meshes used by the benchmark, structured quads at each mesh size: a long wall (narrow band) and a
+# square plate (wide band)
+BENCHMARK_PLATES = {
+    "wall": ((8.0, 3.0), (0.5, 0.25, 0.125, 0.0625, 0.03125)),
+    "square": ((8.0, 8.0), (0.25, 0.125, 0.0625)),
+}
+
+# Rules used when no benchmark data is available, from runs of this benchmark on walls and square plates:
+# BandSPD was fastest on small models and on long walls with a narrow band, UmfPack once the band got wide
+SMALL_DOFS = 5000  # Below this setup overhead dominates and the banded solver is used regardless of fill
+MAX_BAND_FILL = 40.0  # Banded storage over actual non-zeros, above this the sparse solver is used
+
+_benchmark_cache = {}
+
+
+# Function to estimate the stiffness matrix size and sparsity of a mesh after RCM ordering
+def mesh_sparsity(elements, n_nodes):
+    graph = node_graph(elements, n_nodes)
+    order = reverse_cuthill_mckee(graph, symmetric_mode=True)
+    bandwidth, profile = bandwidth_profile(graph[order][:, order])
+
+    # Two DOFs per node, every coupled node pair is a 2 x 2 block
+    dofs = 2 * n_nodes
+    nnz = 4 * graph.nnz
+    dof_bandwidth = 2 * bandwidth + 1
+    return {
+        "dofs": dofs,
+        "nnz": nnz,
+        "bandwidth": dof_bandwidth,
+        "band_fill": dofs * (2 * dof_bandwidth + 1) / nnz,
+        "density": nnz / dofs ** 2,
+    }
+
+
+# Function to read benchmark records, cached per file
+def read_benchmark(filename=BENCHMARK_FILE):
+    if filename not in _benchmark_cache:
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'r') as f:
+            _benchmark_cache[filename] = json.load(f)["records"]
+    return _benchmark_cache[filename]
+
+
+# Function to pick the fastest measured solver on the benchmark mesh closest in DOF count and band fill
+def fastest_measured(records, sparsity):
+    records = [record for record in records if record["ok"]]
+    if not records:
+        return None
+
+    meshes = sorted({(record["dofs"], record["band_fill"]) for record in records})
+    distance = [np.hypot(np.log(dofs / sparsity["dofs"]), np.log(fill / sparsity["band_fill"]))
+                for dofs, fill in meshes]
+    nearest = meshes[int(np.argmin(distance))]
+    candidates = [record for record in records if (record["dofs"], record["band_fill"]) == nearest]
+    return min(candidates, key=lambda record: record["total"])
+
+
+# Function to choose the linear system solver for a mesh, from benchmark data when available
+def select_solver(vertices, elements, benchmark=BENCHMARK_FILE):
+    sparsity = mesh_sparsity(elements, len(vertices))
+    dofs = sparsity["dofs"]
+
+    records = read_benchmark(benchmark) if benchmark else None
+    measured = fastest_measured(records, sparsity) if records else None
+    if measured is not None:
+        return {"system": measured["system"], "sparsity": sparsity,
+                "reason": f"fastest in benchmark at {measured['dofs']} DOFs"}
+
+    if dofs <= SMALL_DOFS:
+        system, reason = 'BandSPD', f"{dofs} DOFs <= {SMALL_DOFS}"
+    elif sparsity["band_fill"] <= MAX_BAND_FILL:
+        system, reason = 'BandSPD', f"band fill {sparsity['band_fill']:.1f} <= {MAX_BAND_FILL}"
+    else:
+        system, reason = 'UmfPack', f"band fill {sparsity['band_fill']:.1f} > {MAX_BAND_FILL}"
+    return {"system": system, "sparsity": sparsity, "reason": reason}
+
+
+# Function to time one solver on a mesh: total = first step (assemble, factor, solve), solve = a second step that
+# only back-substitutes, factor = the difference
+def time_solver(vertices, elements, system):
+    # Imported here, model_builder imports this module to resolve system='auto'
+    from model_builder import build_model
+
+    build_model(vertices, elements, {"E": 30100.0, "nu": 0.2}, {"thickness": 350.0},
+                supports=[{"where": 'ends', "dofs": [1, 1]}],
+                loads=[{"type": 'line', "where": 'top', "qy": -1500.0}],
+                analysis={"system": system})
+
+    # Linear with -factorOnce re-uses the factorization on the second step, which then only back-substitutes
+    ops.algorithm('Linear', '-factorOnce')
+    t0 = time.perf_counter()
+    first = ops.analyze(1)
+    t1 = time.perf_counter()
+    second = ops.analyze(1)
+    t2 = time.perf_counter()
+
+    return {"ok": first == 0 and second == 0, "total": t1 - t0, "solve": t2 - t1,
+            "factor": max(0.0, (t1 - t0) - (t2 - t1))}
+
+
+# Function to benchmark every solver on a set of generated wall and plate meshes
+def benchmark(plates=BENCHMARK_PLATES, systems=SYSTEMS, repeats=3):
+    from structured_mesher import mesh_plate
+
+    meshes = [(name, size, mesh_size) for name, (size, mesh_sizes) in plates.items() for mesh_size in mesh_sizes]
+
+    records = []
+    for name, size, mesh_size in meshes:
+        vertices, elements = mesh_plate(*size, mesh_size)
+        vertices = vertices[:, :2]
+        sparsity = mesh_sparsity(elements, len(vertices))
+
+        for system in systems:
+            try:
+                runs = [time_solver(vertices, elements, system) for _ in range(repeats)]
+                ok = all(run["ok"] for run in runs)
+                best = min(runs, key=lambda run: run["total"])
+            except Exception:
+                ok, best = False, {"total": float('nan'), "factor": float('nan'), "solve": float('nan')}
+
+            record = {"mesh": name, "mesh_size": mesh_size, "dofs": sparsity["dofs"], "nnz": sparsity["nnz"],
+                      "bandwidth": sparsity["bandwidth"], "band_fill": sparsity["band_fill"], "system": system,
+                      "ok": ok,
+                      "total": best["total"], "factor": best["factor"], "solve": best["solve"]}
+            records.append(record)
+            print(f"{name:<7} {sparsity['dofs']:>8} DOFs  {system:<10}  "
+                  + (f"factor {best['factor'] * 1000:8.1f} ms  solve {best['solve'] * 1000:7.1f} ms  "
+                     f"total {best['total'] * 1000:8.1f} ms" if ok else "failed"))
+
+    ops.wipe()
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the OpenSees linear system solvers on plate meshes.")
+    parser.add_argument("-o", "--output", default=BENCHMARK_FILE, help="benchmark results file")
+    parser.add_argument("--systems", nargs='+', default=SYSTEMS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--quick", action='store_true', help="skip the largest mesh of each plate")
+    args = parser.parse_args(argv)
+
+    plates = BENCHMARK_PLATES
+    if args.quick:
+        plates = {name: (size, mesh_sizes[:-1]) for name, (size, mesh_sizes) in plates.items()}
+
+    records = benchmark(plates, args.systems, args.repeats)
+    with open(args.output, 'w') as f:
+        json.dump({"plates": plates, "records": records}, f, indent=2)
+    print(f"Benchmark written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from boundary_index import BoundaryIndex
+from isoparametric import QUADRATURE, jacobian, shape_functions
+from load_cases import superpose
+from mesh_io import element_type_for
+from model_builder import is_linear_elastic, load_mesh, load_vector, run_model, timed
+from results import averaging_matrix, nodal_stresses, node_results, stress_invariants
+
+# Element types assembled by the backend, the others raise a ValueError
+ELEMENT_TYPES = ('tri31', 'quad4')
+
+
+# Function to return the plane-stress or plane-strain elasticity matrix
+def elasticity_matrix(E, nu, plane='PlaneStress'):
+    if plane == 'PlaneStress':
+        return E / (1.0 - nu ** 2) * np.array([[1.0, nu, 0.0], [nu, 1.0, 0.0], [0.0, 0.0, (1.0 - nu) / 2.0]])
+    if plane == 'PlaneStrain':
+        return E / ((1.0 + nu) * (1.0 - 2.0 * nu)) * np.array(
+            [[1.0 - nu, nu, 0.0], [nu, 1.0 - nu, 0.0], [0.0, 0.0, (1.0 - 2.0 * nu) / 2.0]])
+    raise ValueError(f"Unsupported section type: {plane}")
+
+
+# Function to compute strain-displacement matrices (m, g, 3, 2n) and integration weights t * w * det(J) (m, g)
+def strain_displacement(vertices, elements, element_type, thickness):
+    if element_type not in ELEMENT_TYPES:
+        raise ValueError(f"The sparse backend supports tri31 and quad4 elements, not {element_type}.")
+
+    points, weights = QUADRATURE[element_type]
+    _, dN = shape_functions(element_type, points)
+    detJ, dNdx = jacobian(vertices, elements, dN)
+
+    m, g, _, n = dNdx.shape
+    B = np.zeros((m, g, 3, 2 * n))
+    B[:, :, 0, 0::2] = dNdx[:, :, 0]
+    B[:, :, 1, 1::2] = dNdx[:, :, 1]
+    B[:, :, 2, 0::2] = dNdx[:, :, 1]
+    B[:, :, 2, 1::2] = dNdx[:, :, 0]
+
+    return B, thickness * weights * detJ
+
+
+# Function to compute the stiffness matrix of every element at once, (m, 2n, 2n)
+def element_stiffness(B, weights, D):
+    BT = np.swapaxes(B, 2, 3) * weights[:, :, None, None]
+    return np.matmul(BT, D @ B).sum(axis=1)
+
+
+# Function to return the global DOF numbers of every element, (m, 2n)
+def element_dofs(elements):
+    return np.stack([2 * elements, 2 * elements + 1], axis=2).reshape(len(elements), -1)
+
+
+# Function to assemble element matrices into a global CSR matrix with a single COO conversion
+def assemble(element_matrices, dofs, n_dofs):
+    size = dofs.shape[1]
+    rows = np.broadcast_to(dofs[:, :, None], (len(dofs), size, size)).ravel()
+    cols = np.broadcast_to(dofs[:, None, :], (len(dofs), size, size)).ravel()
+    return sp.coo_matrix((element_matrices.ravel(), (rows, cols)), shape=(n_dofs, n_dofs)).tocsr()
+
+
+# Elastic plane model assembled and factorized in NumPy/SciPy without OpenSees, the stiffness is factorized once
+# and every load case is a back-substitution, same interface as load_cases.LoadCaseManager
+class SparseModel:
+    def __init__(self, vertices, elements, material, section, supports=(), boundary_tags=None):
+        if not is_linear_elastic(material):
+            raise ValueError("The sparse backend only supports linear elastic materials.")
+        if section.get("pressure"):
+            raise ValueError("Element pressure loads are not supported by the sparse backend.")
+
+        self.vertices = np.asarray(vertices, dtype=np.float64)[:, :2]
+        self.elements = np.asarray(elements, dtype=np.int64)
+        self.element_type = element_type_for(self.elements)
+        self.thickness = section["thickness"]
+        self.n_dofs = 2 * len(self.vertices)
+        self.timings = {}
+
+        # Solved load cases and combinations: name -> {"displacements", "reactions"}
+        self.solutions = {}
+        self.case_timings = {}
+        self.averaging = None
+
+        with timed(self.timings, "element_matrices"):
+            self.D = elasticity_matrix(material["E"], material["nu"], section.get("type", 'PlaneStress'))
+            self.B, self.weights = strain_displacement(self.vertices, self.elements, self.element_type,
+                                                       self.thickness)
+            element_matrices = element_stiffness(self.B, self.weights, self.D)
+
+        with timed(self.timings, "assemble"):
+            self.dofs = element_dofs(self.elements)
+            self.K = assemble(element_matrices, self.dofs, self.n_dofs)
+
+        # Supported DOFs are removed from the system (zero prescribed displacement)
+        with timed(self.timings, "supports"):
+            self.index = BoundaryIndex(self.vertices, self.elements, boundary_tags)
+            fixity = np.zeros((len(self.vertices), 2), dtype=bool)
+            for support in supports:
+                nodes = self.index.select(support["where"])
+                fixity[nodes] |= np.asarray(support.get("dofs", [1, 1]), dtype=bool)
+            self.free = np.flatnonzero(~fixity.ravel())
+
+        with timed(self.timings, "factorize"):
+            K_free = self.K[self.free][:, self.free].tocsc()
+            # K is symmetric positive definite: symmetric ordering, no pivoting off the diagonal
+            self.factor = splu(K_free, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                               options={"SymmetricMode": True})
+
+    # Function to solve one load case, returns its nodal displacements (N, 2)
+    def solve(self, name, loads):
+        timings = {}
+        with timed(timings, "loads"):
+            forces = load_vector(self.vertices, loads, self.elements, self.thickness, self.index).ravel()
+
+        with timed(timings, "solve"):
+            u = np.zeros(self.n_dofs)
+            u[self.free] = self.factor.solve(forces[self.free])
+
+        # Reactions follow the OpenSees sign convention: resisting force minus applied load
+        with timed(timings, "results"):
+            reactions = self.K @ u - forces
+            reactions[self.free] = 0.0
+            self.solutions[name] = {"displacements": u.reshape(-1, 2), "reactions": reactions.reshape(-1, 2)}
+
+        self.case_timings[name] = timings
+        return self.solutions[name]["displacements"]
+
+    # Function to solve several load cases, load_cases = [{"name": ..., "loads": [...]}, ...]
+    def solve_all(self, load_cases):
+        for case in load_cases:
+            self.solve(case["name"], case["loads"])
+        return self.solutions
+
+    # Function to superpose solved load cases, factors = {case name: factor}
+    def combine(self, name, factors):
+        self.solutions[name] = superpose(self.solutions, factors)
+        return self.solutions[name]["displacements"]
+
+    # Function to compute quadrature point stresses (m, g, 3) and averaged nodal stresses (N, 3): sxx, syy, sxy
+    def stresses(self, displacements):
+        u = np.asarray(displacements).ravel()[self.dofs]
+        gauss = np.einsum('kl,mglj,mj->mgk', self.D, self.B, u)
+
+        if self.averaging is None:
+            self.averaging = averaging_matrix(self.elements, len(self.vertices))
+        return gauss, nodal_stresses(self.elements, gauss, len(self.vertices), self.averaging)
+
+    # Function to return the nodal stress table of a solved case, columns as results.STRESS_COLUMNS
+    def stress_table(self, name):
+        _, nodal = self.stresses(self.solutions[name]["displacements"])
+        return stress_invariants(nodal)
+
+
+# Function to build and solve one load case with the sparse backend, returns displacements, reactions and timings
+def solve_model(vertices, elements, material, section, supports=(), loads=()):
+    model = SparseModel(vertices, elements, material, section, supports)
+    model.solve("case", loads)
+    return {**model.solutions["case"], "timings": {**model.timings, **model.case_timings["case"]}}
+
+
+# Function to solve a model with OpenSees and with the sparse backend, returns both times and the largest
+# differences relative to the OpenSees results
+def compare_with_opensees(vertices, elements, material, section, supports=(), loads=()):
+    t0 = time.perf_counter()
+    run_model(vertices, elements, material, section, supports, loads)
+    displacements, reactions = node_results(len(vertices))
+    t1 = time.perf_counter()
+
+    result = solve_model(vertices, elements, material, section, supports, loads)
+    t2 = time.perf_counter()
+
+    return {
+        "opensees": t1 - t0,
+        "sparse": t2 - t1,
+        "displacement_difference": float(np.abs(result["displacements"] - displacements).max()
+                                         / max(np.abs(displacements).max(), 1e-300)),
+        "reaction_difference": float(np.abs(result["reactions"] - reactions).max()
+                                     / max(np.abs(reactions).max(), 1e-300)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the sparse backend against OpenSees on a plate model.")
+    parser.add_argument("mesh", nargs='?', help="mesh file, a structured 8 x 3 quad wall when left out")
+    parser.add_argument("--mesh-size", type=float, default=0.25, help="structured wall mesh size")
+    parser.add_argument("--element-type", default='quad', choices=('quad', 'triangle'))
+    args = parser.parse_args(argv)
+
+    if args.mesh:
+        vertices, elements = load_mesh(args.mesh)
+    else:
+        from structured_mesher import mesh_plate
+        vertices, elements = mesh_plate(8.0, 3.0, args.mesh_size, element_type=args.element_type)
+        vertices = vertices[:, :2]
+
+    # Wall of op_quad_model.py: ends restrained, top edge load shared by the top edge nodes
+    report = compare_with_opensees(vertices, elements, {"E": 30100.0, "nu": 0.2},
+                                   {"thickness": 350.0, "type": 'PlaneStress'},
+                                   supports=[{"where": 'ends', "dofs": [1, 1]}],
+                                   loads=[{"type": 'nodal', "where": 'top', "fy": -12500.0, "total": True}])
+
+    print(f"{len(vertices)} nodes, {len(elements)} elements")
+    print(f"  OpenSees: {report['opensees'] * 1000:.1f} ms, sparse backend: {report['sparse'] * 1000:.1f} ms")
+    print(f"  max relative difference: displacements {report['displacement_difference']:.1e}, "
+          f"reactions {report['reaction_difference']:.1e}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
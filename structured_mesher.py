@@ -0,0 +1,44 @@
+import numpy as np
+
+from higher_order import elevate_order
+
+
+# Function to mesh a plain rectangular plate as a structured grid, no gmsh call needed
+# order=2 adds midside nodes (tri6/quad8), plus centre nodes for 9-node quads with lagrange=True
+def mesh_plate(width, length, mesh_size, element_type='quad', order=1, lagrange=False):
+    # Number of divisions so that no element is larger than mesh_size
+    nx = max(1, int(np.ceil(width / mesh_size - 1e-9)))
+    ny = max(1, int(np.ceil(length / mesh_size - 1e-9)))
+
+    # Node coordinates, numbered row by row from the bottom-left corner
+    x, y = np.meshgrid(np.linspace(0.0, width, nx + 1), np.linspace(0.0, length, ny + 1))
+    vertices = np.column_stack([x.ravel(), y.ravel(), np.zeros(x.size)])
+
+    # Corner node ids of every cell, counter-clockwise from the bottom-left
+    ids = np.arange(x.size).reshape(ny + 1, nx + 1)
+    n1 = ids[:-1, :-1].ravel()
+    n2 = ids[:-1, 1:].ravel()
+    n3 = ids[1:, 1:].ravel()
+    n4 = ids[1:, :-1].ravel()
+
+    if element_type == 'quad':
+        elements = np.column_stack([n1, n2, n3, n4])
+    elif element_type == 'triangle':
+        # Split each cell along its n1-n3 diagonal into two counter-clockwise triangles
+        elements = np.column_stack([n1, n2, n3, n1, n3, n4]).reshape(-1, 3)
+    else:
+        raise ValueError(f"Unsupported element type: {element_type}")
+
+    # Number the plate corners first, like gmsh and triangle do (the cantilever examples rely on nodes 1-4)
+    corners = np.array([ids[0, 0], ids[0, -1], ids[-1, -1], ids[-1, 0]])
+    node_order = np.concatenate([corners, np.setdiff1d(ids.ravel(), corners)])
+    new_index = np.empty_like(node_order)
+    new_index[node_order] = np.arange(len(node_order))
+    vertices = vertices[node_order]
+    elements = new_index[elements]
+
+    # Quadratic nodes are appended after the grid nodes, so the corner ids are kept
+    if order == 2:
+        return elevate_order(vertices, elements, lagrange=lagrange)
+
+    return vertices, elements
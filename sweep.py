@@ -0,0 +1,210 @@
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Parameters that can be swept, each maps onto a key of the base job
+SWEEP_PARAMETERS = ("thickness", "E", "nu", "load_scale", "mesh_size")
+
+# Load spec keys that carry a magnitude, scaled by load_scale: nodal and area forces, line loads, body forces and
+# pressures
+LOAD_VALUE_KEYS = ("fx", "fy", "qx", "qy", "bx", "by", "p")
+
+# Meshes most recently built by this worker process, keyed by the mesh spec, the least recently used one is
+# dropped beyond WORKER_MESHES so sweeps over many mesh sizes do not keep every mesh in every worker
+WORKER_MESHES = 4
+_worker_meshes = OrderedDict()
+
+# Model kept in this worker's OpenSees domain: {"key": mesh, supports and analysis spec, "model": ReanalysisModel}
+_worker_model = {}
+
+
+# Function to give a case a stable id from its parameter values and the whole resolved job (base job plus the
+# overrides), so editing the base job file changes every id and resuming never returns results of the old job
+def case_id(params, job):
+    case = {"params": params, "job": job}
+    return hashlib.sha256(json.dumps(case, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+# Function to expand a sweep spec into one job per combination of parameter values
+def expand_cases(sweep):
+    names = [name for name in SWEEP_PARAMETERS if name in sweep["parameters"]]
+    unknown = set(sweep["parameters"]) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unsupported sweep parameters: {', '.join(sorted(unknown))}")
+
+    cases = []
+    for values in itertools.product(*(sweep["parameters"][name] for name in names)):
+        params = dict(zip(names, values))
+        job = copy.deepcopy(sweep["job"])
+
+        if "thickness" in params:
+            job["section"]["thickness"] = params["thickness"]
+        if "E" in params:
+            job["material"]["E"] = params["E"]
+        if "nu" in params:
+            job["material"]["nu"] = params["nu"]
+        if "mesh_size" in params:
+            job["mesh"]["mesh_size"] = params["mesh_size"]
+        if "load_scale" in params:
+            for case in job["load_cases"]:
+                for load in case["loads"]:
+                    for key in LOAD_VALUE_KEYS:
+                        if key in load:
+                            load[key] *= params["load_scale"]
+
+        cases.append({"id": case_id(params, job), "params": params, "job": job})
+    return cases
+
+
+# Function to run one sweep case in a worker process, every worker has its own OpenSees interpreter
+# reuse=True keeps the worker's model between cases on the same mesh and only updates what changed
+def run_case(case, reuse=True):
+    # Imported in the worker so the parent process never loads OpenSees
+    from batch_runner import DEFAULT_JOB, make_mesh
+    from model_builder import run_model, timed
+    from reanalysis import ReanalysisModel
+    from results import collect_results
+
+    t0 = time.perf_counter()
+    record = {"id": case["id"], "params": case["params"], "pid": os.getpid()}
+    try:
+        job = {**DEFAULT_JOB, **case["job"]}
+        timings = {}
+
+        # Cases that only change material, thickness or loads reuse the worker's mesh
+        mesh_key = json.dumps(job["mesh"], sort_keys=True)
+        with timed(timings, "mesh"):
+            if mesh_key not in _worker_meshes:
+                _worker_meshes[mesh_key] = make_mesh(job["mesh"])
+                while len(_worker_meshes) > WORKER_MESHES:
+                    _worker_meshes.popitem(last=False)
+            _worker_meshes.move_to_end(mesh_key)
+        vertices, elements, boundary_tags = _worker_meshes[mesh_key]
+
+        section = {**DEFAULT_JOB["section"], **job["section"]}
+        model_key = json.dumps([job["mesh"], job["supports"], job["analysis"], job["material"].get("type")],
+                               sort_keys=True)
+        load_cases = {}
+        for load_case in job["load_cases"]:
+            rebuilt = ["domain"]
+            if not reuse:
+                case_timings = run_model(vertices, elements, job["material"], section, job["supports"],
+                                         load_case["loads"], job["analysis"], boundary_tags)
+            elif _worker_model.get("key") != model_key:
+                model = ReanalysisModel(vertices, elements, job["material"], section, job["supports"],
+                                        load_case["loads"], job["analysis"], boundary_tags)
+                _worker_model.update(key=model_key, model=model)
+                case_timings = model.reports[-1]["timings"]
+            else:
+                # Same mesh, supports and analysis as the worker's last analysis: warm-started reanalysis
+                model = _worker_model["model"]
+                model.update(job["material"], section, load_case["loads"])
+                case_timings = model.reports[-1]["timings"]
+                rebuilt = model.reports[-1]["rebuilt"]
+            results = collect_results(elements, len(vertices))
+            displacement = np.linalg.norm(results["displacements"], axis=1)
+            load_cases[load_case["name"]] = {
+                "max_displacement": float(displacement.max()),
+                "max_von_mises": float(results["stresses"][:, 3].max()),
+                "reaction_sum": results["reactions"].sum(axis=0).tolist(),
+                "rebuilt": rebuilt,
+                "timings": case_timings,
+            }
+
+        record.update({"status": "ok", "nodes": len(vertices), "elements": len(elements),
+                       "timings": timings, "load_cases": load_cases})
+    except Exception:
+        # A failed case can leave the domain half updated, the next case on this worker starts from a fresh model
+        _worker_model.clear()
+        record.update({"status": "failed", "error": traceback.format_exc()})
+
+    record["seconds"] = time.perf_counter() - t0
+    return record
+
+
+# Function to read the ids of cases already completed in a results file
+def completed_cases(results_file):
+    done = set()
+    if not os.path.exists(results_file):
+        return done
+
+    with open(results_file, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by an interrupted run
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+# Function to run a sweep across a process pool, results are appended to results_file as they finish
+def run_sweep(sweep, results_file, workers=None, resume=True, reuse=True):
+    cases = expand_cases(sweep)
+
+    if not resume and os.path.exists(results_file):
+        os.remove(results_file)
+    done = completed_cases(results_file)
+    pending = [case for case in cases if case["id"] not in done]
+    print(f"Sweep: {len(cases)} cases, {len(done & {case['id'] for case in cases})} already done, "
+          f"{len(pending)} to run")
+
+    # Terminate a line cut short by an interrupted run so new records start on their own line
+    if os.path.exists(results_file) and os.path.getsize(results_file):
+        with open(results_file, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    t0 = time.perf_counter()
+    failed = 0
+
+    # Spawned workers start from a clean interpreter, each holding its own OpenSees domain
+    context = multiprocessing.get_context('spawn')
+    with open(results_file, 'a') as f, ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(run_case, case, reuse) for case in pending]
+        for count, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+
+            if record["status"] != "ok":
+                failed += 1
+            print(f"[{count}/{len(pending)}] {record['id']} {record['params']}: {record['status']} "
+                  f"({record['seconds']:.2f} s)")
+
+    print(f"Sweep finished in {time.perf_counter() - t0:.2f} s, {failed} failed")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a parametric sweep of plane-stress analyses in parallel.")
+    parser.add_argument("sweep_file", help="JSON sweep spec: {\"job\": {...}, \"parameters\": {...}}")
+    parser.add_argument("-o", "--output", default="sweep_results.jsonl", help="results file (JSON lines)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--restart", action='store_true', help="discard earlier results instead of resuming")
+    parser.add_argument("--no-reuse", action='store_true',
+                        help="rebuild the model for every case instead of updating the worker's model")
+    args = parser.parse_args(argv)
+
+    with open(args.sweep_file, 'r') as f:
+        sweep = json.load(f)
+
+    failed = run_sweep(sweep, args.output, workers=args.workers, resume=not args.restart, reuse=not args.no_reuse)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from boundary_index import BoundaryIndex, free_edges, pack_boundary_tags
+from higher_order import elevate_order
+from mesh_io import BOUNDARY_GROUPS
+
+
+# Function to build a 4 x 3 grid of unit quads with the two middle elements removed, leaving a 2 x 1 opening
+def wall_with_opening():
+    x, y = np.meshgrid(np.arange(5.0), np.arange(4.0))
+    vertices = np.column_stack([x.ravel(), y.ravel()])
+    elements = np.array([[j * 5 + i, j * 5 + i + 1, (j + 1) * 5 + i + 1, (j + 1) * 5 + i]
+                         for j in range(3) for i in range(4) if not (j == 1 and i in (1, 2))])
+    return vertices, elements
+
+
+def nodes_at(vertices, points):
+    return np.sort([int(np.flatnonzero((vertices == point).all(axis=1))[0]) for point in points])
+
+
+def test_free_edges_of_the_outer_boundary_and_the_opening():
+    vertices, elements = wall_with_opening()
+    edges, midside, owners = free_edges(elements)
+
+    # 14 outer edges and 6 opening edges, each owned by the element it bounds
+    assert len(edges) == 20
+    assert np.all(midside == -1)
+    assert all(set(edge) <= set(elements[owner]) for edge, owner in zip(edges.tolist(), owners.tolist()))
+
+
+def test_edge_sets():
+    vertices, elements = wall_with_opening()
+    index = BoundaryIndex(vertices, elements)
+
+    np.testing.assert_array_equal(index.select('left'), nodes_at(vertices, [[0, y] for y in range(4)]))
+    np.testing.assert_array_equal(index.select('top'), nodes_at(vertices, [[x, 3] for x in range(5)]))
+    np.testing.assert_array_equal(index.select('ends'), np.union1d(index.select('left'), index.select('right')))
+    np.testing.assert_array_equal(index.select('opening'),
+                                  nodes_at(vertices, [[1, 1], [2, 1], [3, 1], [1, 2], [2, 2], [3, 2]]))
+    assert len(index.select('boundary')) == 20
+    np.testing.assert_array_equal(index.select('all'), np.arange(len(vertices)))
+    with pytest.raises(ValueError):
+        index.select('middle')
+
+
+def test_point_and_segment_selections():
+    vertices, elements = wall_with_opening()
+    index = BoundaryIndex(vertices, elements)
+
+    np.testing.assert_array_equal(index.select({"near": [2.1, 2.9]}), nodes_at(vertices, [[2, 3]]))
+    np.testing.assert_array_equal(index.select({"near": [2.0, 3.0], "radius": 1.01}),
+                                  nodes_at(vertices, [[1, 3], [2, 2], [2, 3], [3, 3]]))
+    # Only boundary nodes are picked along a segment
+    np.testing.assert_array_equal(index.select({"line": [[0.0, 1.5], [4.0, 1.5]], "tol": 0.6}),
+                                  nodes_at(vertices, [[0, 1], [0, 2], [1, 1], [1, 2], [2, 1], [2, 2], [3, 1], [3, 2],
+                                                      [4, 1], [4, 2]]))
+    np.testing.assert_array_equal(index.select([1, 5]), [0, 4])
+
+
+def test_quadratic_edges_keep_their_midside_nodes():
+    vertices, elements = elevate_order(*wall_with_opening())
+    index = BoundaryIndex(vertices, elements)
+
+    assert np.all(index.midside >= 0)
+    np.testing.assert_array_equal(index.select('left'), np.flatnonzero(vertices[:, 0] == 0.0))
+    assert len(index.select('opening')) == 12
+
+
+def test_boundary_tags_replace_the_geometric_sets():
+    vertices, elements = wall_with_opening()
+    index = BoundaryIndex(vertices, elements)
+    tags = index.boundary_tags()
+    np.testing.assert_array_equal(tags, pack_boundary_tags(len(vertices), index.sets))
+
+    # Tagging only the lower half of the left edge overrides the geometric left set, the other sets round-trip
+    lower_left = nodes_at(vertices, [[0, 0], [0, 1]])
+    tags &= ~(1 << BOUNDARY_GROUPS.index('left'))
+    tags[lower_left] |= 1 << BOUNDARY_GROUPS.index('left')
+    tagged = BoundaryIndex(vertices, elements, tags)
+    np.testing.assert_array_equal(tagged.select('left'), lower_left)
+    for name in ('top', 'bottom', 'right', 'opening'):
+        np.testing.assert_array_equal(tagged.select(name), index.select(name))
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from boundary_index import BoundaryIndex
+from load_integration import area_forces, edge_forces, shape_integrals
+from model_builder import load_vector
+from structured_mesher import mesh_plate
+
+# (element_type, order, lagrange) of the structured meshes: quad4, quad8, quad9, tri31, tri6
+MESHES = [('quad', 1, False), ('quad', 2, False), ('quad', 2, True), ('triangle', 1, False), ('triangle', 2, False)]
+
+
+def plate(element_type='quad', order=1, lagrange=False, width=4.0, length=2.0, mesh_size=0.5):
+    vertices, elements = mesh_plate(width, length, mesh_size, element_type=element_type, order=order,
+                                    lagrange=lagrange)
+    return np.asarray(vertices)[:, :2], np.asarray(elements)
+
+
+@pytest.mark.parametrize("mesh", MESHES)
+def test_area_and_body_loads_sum_to_the_total(mesh):
+    vertices, elements = plate(*mesh)
+    np.testing.assert_allclose(shape_integrals(vertices, elements).sum(), 8.0)
+
+    forces = area_forces(vertices, elements, [0.0, -5.0])
+    np.testing.assert_allclose(forces.sum(axis=0), [0.0, -5.0 * 8.0])
+
+    # A body force per unit volume acts through the thickness
+    body = load_vector(vertices, [{"type": 'body', "bx": 1.0, "by": -2.0}], elements, thickness=0.5)
+    np.testing.assert_allclose(body.sum(axis=0), [0.5 * 8.0, -0.5 * 2.0 * 8.0])
+
+    total = area_forces(vertices, elements, [3.0, 0.0], total=True)
+    np.testing.assert_allclose(total.sum(axis=0), [3.0, 0.0])
+
+
+def test_area_load_shares_of_quadratic_elements():
+    # One element of area A: tri6 corners take 0 and midside nodes A/3, quad8 corners -A/12 and midside nodes A/3
+    vertices, elements = plate('triangle', 2, width=1.0, length=1.0, mesh_size=1.0)
+    integrals = shape_integrals(vertices, elements)
+    np.testing.assert_allclose(integrals[:, :3], 0.0, atol=1e-15)
+    np.testing.assert_allclose(integrals[:, 3:], 0.5 / 3.0)
+
+    vertices, elements = plate('quad', 2, width=1.0, length=1.0, mesh_size=1.0)
+    np.testing.assert_allclose(shape_integrals(vertices, elements), [[-1 / 12] * 4 + [1 / 3] * 4])
+
+
+def test_line_load_on_linear_edges():
+    vertices, elements = plate()
+    index = BoundaryIndex(vertices, elements)
+    top = index.select('top')
+    forces = edge_forces(vertices, elements, index, top, q=(0.0, -1500.0))
+
+    # 0.5 long edges: half an edge at the corners, a whole edge in between
+    fy = forces[top, 1]
+    corners = np.isin(vertices[top, 0], [0.0, 4.0])
+    np.testing.assert_allclose(fy[corners], -1500.0 * 0.25)
+    np.testing.assert_allclose(fy[~corners], -1500.0 * 0.5)
+    np.testing.assert_allclose(forces.sum(axis=0), [0.0, -1500.0 * 4.0])
+
+
+def test_line_load_on_quadratic_edges():
+    vertices, elements = plate('quad', 2)
+    index = BoundaryIndex(vertices, elements)
+    top = index.select('top')
+    forces = edge_forces(vertices, elements, index, top, q=(0.0, -6.0), total=True)
+
+    # 1/6, 2/3, 1/6 of each edge's share of the total
+    fy = forces[top, 1]
+    x = vertices[top, 0]
+    midside = np.isclose(x % 0.5, 0.25)
+    np.testing.assert_allclose(fy[midside], -6.0 / 8 * 2 / 3)
+    np.testing.assert_allclose(fy[np.isin(x, [0.0, 4.0])], -6.0 / 8 / 6)
+    np.testing.assert_allclose(forces.sum(axis=0), [0.0, -6.0])
+
+
+@pytest.mark.parametrize("mesh", MESHES)
+def test_pressure_pushes_into_the_plate(mesh):
+    vertices, elements = plate(*mesh)
+    forces = load_vector(vertices, [{"type": 'pressure', "where": 'left', "p": 10.0},
+                                    {"type": 'pressure', "where": 'top', "p": 2.0}], elements, thickness=0.5)
+
+    # Left edge 2 long pushed in +x, top edge 4 long pushed in -y
+    np.testing.assert_allclose(forces.sum(axis=0), [10.0 * 0.5 * 2.0, -2.0 * 0.5 * 4.0])
+    assert np.all(forces[vertices[:, 0] > 1e-9, 0] == 0.0)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from boundary_index import BoundaryIndex
+from mesh_io import BOUNDARY_GROUPS, ELEMENT_TYPES, element_type_for, read_mesh, write_mesh
+from structured_mesher import mesh_plate
+
+# (element_type, order, lagrange) of the structured meshes: quad4, quad8, quad9, tri31, tri6
+MESHES = [('quad', 1, False), ('quad', 2, False), ('quad', 2, True), ('triangle', 1, False), ('triangle', 2, False)]
+
+
+def plate(element_type, order, lagrange):
+    vertices, elements = mesh_plate(4.0, 2.0, 0.5, element_type=element_type, order=order, lagrange=lagrange)
+    return np.asarray(vertices)[:, :2], np.asarray(elements)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+@pytest.mark.parametrize("mesh", MESHES)
+def test_binary_round_trip(tmp_path, mesh, mmap):
+    vertices, elements = plate(*mesh)
+    tags = BoundaryIndex(vertices, elements).boundary_tags()
+    filename = str(tmp_path / "plate.feamesh")
+    write_mesh(filename, vertices, elements, boundary_tags=tags)
+
+    read = read_mesh(filename, mmap=mmap)
+    np.testing.assert_array_equal(read["vertices"], vertices)
+    np.testing.assert_array_equal(read["elements"], elements)
+    np.testing.assert_array_equal(read["boundary_tags"], tags)
+    assert np.all(read["element_types"] == ELEMENT_TYPES[element_type_for(elements)])
+
+    # Memory-mapped arrays are read-only views of the file
+    if mmap:
+        assert isinstance(read["vertices"], np.memmap)
+        assert not read["vertices"].flags.writeable
+
+
+def test_load_mesh_returns_the_boundary_tags(tmp_path):
+    from model_builder import load_mesh
+
+    vertices, elements = plate('quad', 1, False)
+    filename = str(tmp_path / "plate.feamesh")
+    write_mesh(filename, vertices, elements)
+    loaded_vertices, loaded_elements, tags = load_mesh(filename, boundary_tags=True)
+    np.testing.assert_array_equal(loaded_vertices, vertices)
+    np.testing.assert_array_equal(loaded_elements, elements)
+    assert not tags.any()
+
+
+def test_text_mesh(tmp_path):
+    filename = tmp_path / "mesh_file"
+    filename.write_text("node 1 0.0 0.0\nnode 2 1.0 0.0\nnode 3 1.0 1.0\nnode 4 0.0 1.0\n"
+                        "element tri31 1 1 2 3\nelement tri31 2 1 3 4\n")
+    read = read_mesh(str(filename))
+    np.testing.assert_array_equal(read["vertices"], [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    np.testing.assert_array_equal(read["elements"], [[0, 1, 2], [0, 2, 3]])
+    assert np.all(read["element_types"] == ELEMENT_TYPES['tri31'])
+
+
+@pytest.mark.parametrize("mesh", MESHES)
+def test_msh_round_trip_keeps_the_boundary_groups(tmp_path, mesh):
+    # gmsh loads its shared library on import, a missing library (or system libraries it needs) is an OSError
+    try:
+        from gmsh_mesher import write_msh
+    except (ImportError, OSError) as error:
+        pytest.skip(f"gmsh is not available: {error}")
+
+    vertices, elements = plate(*mesh)
+    boundary = BoundaryIndex(vertices, elements)
+    filename = str(tmp_path / "plate.msh")
+    write_msh(filename, vertices, elements, boundary)
+
+    read = read_mesh(filename)
+    np.testing.assert_allclose(read["vertices"][:, :2], vertices)
+    np.testing.assert_array_equal(read["elements"], elements)
+    for bit, name in enumerate(BOUNDARY_GROUPS):
+        np.testing.assert_array_equal(np.flatnonzero(read["boundary_tags"] & (1 << bit)), boundary.sets[name])
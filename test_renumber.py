@@ -0,0 +1,41 @@
+import numpy as np
+import scipy.sparse as sp
+
+from renumber import PINNED_NODES, bandwidth_profile, dof_bandwidth_profile, node_graph, renumber_mesh
+from structured_mesher import mesh_plate
+
+
+# Function to return a triangle mesh with its nodes shuffled, so renumbering has something to improve
+def shuffled_plate():
+    vertices, elements = mesh_plate(8.0, 3.0, 0.5, element_type='triangle')
+    vertices, elements = np.asarray(vertices)[:, :2], np.asarray(elements)
+    order = np.concatenate([np.arange(PINNED_NODES),
+                            PINNED_NODES + np.random.default_rng(1).permutation(len(vertices) - PINNED_NODES)])
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+    return vertices[order], new_index[elements]
+
+
+def test_renumbering_keeps_the_mesh_and_reduces_the_profile():
+    vertices, elements = shuffled_plate()
+    new_vertices, new_elements, report = renumber_mesh(vertices, elements)
+
+    # Same elements at the same coordinates, the pinned corner nodes keep their ids
+    np.testing.assert_array_equal(new_vertices[new_elements], vertices[elements])
+    np.testing.assert_array_equal(new_vertices[:PINNED_NODES], vertices[:PINNED_NODES])
+    # The pinned corners couple to far nodes and keep the bandwidth wide, the profile is what RCM reduces
+    assert report["profile_after"] < report["profile_before"] / 2
+
+    unchanged = renumber_mesh(vertices, elements, method='none')
+    np.testing.assert_array_equal(unchanged[1], elements)
+
+
+def test_equation_bandwidth_profile_match_the_dof_graph():
+    vertices, elements = shuffled_plate()
+    _, new_elements, report = renumber_mesh(vertices, elements)
+
+    # Stiffness pattern with the 2 DOFs of each node numbered consecutively
+    dof_graph = sp.kron(node_graph(new_elements, len(vertices)), np.ones((2, 2)))
+    assert bandwidth_profile(dof_graph) == (report["equation_bandwidth_after"], report["equation_profile_after"])
+    assert dof_bandwidth_profile(report["bandwidth_before"], report["profile_before"], len(vertices)) == \
+        (report["equation_bandwidth_before"], report["equation_profile_before"])
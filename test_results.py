@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from results import STRESS_COLUMNS, averaging_matrix, nodal_stresses, stress_invariants
+from structured_mesher import mesh_plate
+
+# (element_type, order, lagrange) of the structured meshes: quad4, quad8, quad9, tri31, tri6
+MESHES = [('quad', 1, False), ('quad', 2, False), ('quad', 2, True), ('triangle', 1, False), ('triangle', 2, False)]
+
+
+def plate(element_type, order, lagrange):
+    vertices, elements = mesh_plate(4.0, 2.0, 0.5, element_type=element_type, order=order, lagrange=lagrange)
+    return np.asarray(vertices)[:, :2], np.asarray(elements)
+
+
+def test_stress_invariants():
+    table = stress_invariants(np.array([[30.0, -10.0, 15.0], [5.0, 5.0, 0.0]]))
+    assert table.shape == (2, len(STRESS_COLUMNS))
+
+    sxx, syy, sxy, von_mises, s1, s2, angle = table[0]
+    assert s1 == pytest.approx(10.0 + 25.0) and s2 == pytest.approx(10.0 - 25.0)
+    assert von_mises == pytest.approx(np.sqrt(s1 ** 2 - s1 * s2 + s2 ** 2))
+    # The principal direction turns the stress tensor into diag(s1, s2)
+    c, s = np.cos(angle), np.sin(angle)
+    assert sxx * c * c + syy * s * s + 2 * sxy * s * c == pytest.approx(s1)
+    np.testing.assert_allclose(table[1, [3, 4, 5]], [5.0, 5.0, 5.0])
+
+
+@pytest.mark.parametrize("mesh", MESHES)
+def test_averaging_keeps_a_constant_field(mesh):
+    vertices, elements = plate(*mesh)
+    n_points = {3: 1, 4: 4, 6: 3, 8: 9, 9: 9}[elements.shape[1]]
+    gauss = np.broadcast_to([1.0, -2.0, 0.5], (len(elements), n_points, 3))
+
+    np.testing.assert_allclose(nodal_stresses(elements, gauss, len(vertices)),
+                               np.broadcast_to([1.0, -2.0, 0.5], (len(vertices), 3)), atol=1e-12)
+    np.testing.assert_allclose(averaging_matrix(elements, len(vertices)).sum(axis=1), 1.0)
+
+
+@pytest.mark.parametrize("mesh", MESHES)
+def test_nodal_stresses_match_opsvis(mesh):
+    pytest.importorskip("openseespy")
+    opsvis = pytest.importorskip("opsvis")
+    from model_builder import run_model
+    from results import collect_results
+
+    vertices, elements = plate(*mesh)
+    run_model(vertices, elements, {"E": 30100.0, "nu": 0.2}, {"thickness": 350.0},
+              supports=[{"where": 'ends', "dofs": [1, 1]}], loads=[{"type": 'line', "where": 'top', "qy": -1500.0}])
+    stresses = collect_results(elements, len(vertices))["stresses"]
+
+    reference = opsvis.sig_out_per_node()
+    np.testing.assert_allclose(stresses, reference, rtol=0, atol=1e-12 * np.abs(reference[:, 3]).max())
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from sparse_backend import SparseModel
+from structured_mesher import mesh_plate
+
+# Element types of the sparse backend: quad4, tri31
+MESHES = ['quad', 'triangle']
+
+MATERIAL = {"E": 30100.0, "nu": 0.2}
+SUPPORTS = [{"where": 'ends', "dofs": [1, 1]}]
+LOADS = [{"type": 'line', "where": 'top', "qy": -1500.0}, {"type": 'body', "by": -0.025},
+         {"type": 'pressure', "where": 'left', "p": 1.0}, {"type": 'nodal', "where": {"near": [2.0, 1.0]}, "fx": 40.0}]
+
+
+def plate(element_type):
+    vertices, elements = mesh_plate(4.0, 2.0, 0.5, element_type=element_type)
+    return np.asarray(vertices)[:, :2], np.asarray(elements)
+
+
+@pytest.mark.parametrize("plane", ['PlaneStress', 'PlaneStrain'])
+@pytest.mark.parametrize("mesh", MESHES)
+def test_matches_opensees(mesh, plane):
+    pytest.importorskip("openseespy")
+    from model_builder import run_model
+    from results import collect_results
+
+    vertices, elements = plate(mesh)
+    section = {"thickness": 350.0, "type": plane}
+    run_model(vertices, elements, MATERIAL, section, SUPPORTS, LOADS)
+    reference = collect_results(elements, len(vertices))
+
+    model = SparseModel(vertices, elements, MATERIAL, section, SUPPORTS)
+    model.solve("case", LOADS)
+    for key in ("displacements", "reactions"):
+        scale = np.abs(reference[key]).max()
+        np.testing.assert_allclose(model.solutions["case"][key], reference[key], rtol=0, atol=1e-10 * scale)
+
+    gauss, _ = model.stresses(model.solutions["case"]["displacements"])
+    scale = np.abs(reference["gauss_stresses"]).max()
+    np.testing.assert_allclose(gauss, reference["gauss_stresses"], rtol=0, atol=1e-10 * scale)
+    np.testing.assert_allclose(model.stress_table("case")[:, :6], reference["stresses"][:, :6], rtol=0,
+                               atol=1e-10 * scale)
+
+
+def test_combinations_superpose_the_load_cases():
+    vertices, elements = plate('quad')
+    model = SparseModel(vertices, elements, MATERIAL, {"thickness": 350.0}, SUPPORTS)
+    model.solve("top", LOADS[:1])
+    model.solve("weight", LOADS[1:2])
+    model.solve("direct", [{**LOADS[0], "qy": 1.5 * LOADS[0]["qy"]}, {**LOADS[1], "by": 1.2 * LOADS[1]["by"]}])
+    model.combine("uls", {"top": 1.5, "weight": 1.2})
+
+    for key in ("displacements", "reactions"):
+        np.testing.assert_allclose(model.solutions["uls"][key], model.solutions["direct"][key], rtol=1e-12,
+                                   atol=1e-12 * np.abs(model.solutions["direct"][key]).max())
+
+
+def test_rejects_nonlinear_materials():
+    vertices, elements = plate('quad')
+    with pytest.raises(ValueError):
+        SparseModel(vertices, elements, {"type": 'J2Plasticity', "E": 200.0e6, "nu": 0.3, "fy": 250.0e3},
+                    {"thickness": 0.01}, SUPPORTS)
@@ -0,0 +1,61 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from sweep import expand_cases, run_case
+
+# Structured quad wall, fixed at both ends, every kind of scaled load at once
+JOB = {
+    "mesh": {"width": 4.0, "length": 2.0, "mesh_size": 0.5, "mesher": 'structured'},
+    "material": {"E": 30100.0, "nu": 0.2},
+    "section": {"thickness": 350.0},
+    "load_cases": [{"name": "all", "loads": [
+        {"type": 'nodal', "where": 'top', "fx": 2.0, "fy": -5.0},
+        {"type": 'line', "where": 'top', "qx": 10.0, "qy": -1500.0},
+        {"type": 'body', "bx": 0.0, "by": -0.025},
+        {"type": 'pressure', "where": 'left', "p": 3.0},
+    ]}],
+}
+
+
+def test_load_scale_scales_every_load_value():
+    cases = expand_cases({"job": JOB, "parameters": {"load_scale": [1.0, 2.5]}})
+    for load, scaled in zip(cases[0]["job"]["load_cases"][0]["loads"], cases[1]["job"]["load_cases"][0]["loads"]):
+        for key, value in load.items():
+            assert scaled[key] == (value * 2.5 if isinstance(value, float) else value)
+
+
+def test_reaction_scales_linearly_with_load_scale():
+    pytest.importorskip("openseespy")
+    cases = expand_cases({"job": JOB, "parameters": {"load_scale": [1.0, 2.0, -0.5]}})
+    reactions = []
+    for case in cases:
+        record = run_case(case)
+        assert record["status"] == "ok", record.get("error")
+        reactions.append(np.array(record["load_cases"]["all"]["reaction_sum"]))
+
+    assert np.abs(reactions[0]).max() > 0.0
+    np.testing.assert_allclose(reactions[1], 2.0 * reactions[0], rtol=1e-9)
+    np.testing.assert_allclose(reactions[2], -0.5 * reactions[0], rtol=1e-9)
+
+
+def test_case_id_follows_the_base_job():
+    sweep = {"job": JOB, "parameters": {"E": [25000.0]}}
+    changed = copy.deepcopy(sweep)
+    changed["job"]["section"]["thickness"] = 250.0
+    assert expand_cases(sweep)[0]["id"] != expand_cases(changed)[0]["id"]
+    assert expand_cases(sweep)[0]["id"] == expand_cases(copy.deepcopy(sweep))[0]["id"]
+
+
+def test_worker_mesh_cache_is_bounded():
+    pytest.importorskip("openseespy")
+    import sweep
+
+    sizes = [0.5, 0.4, 0.3, 0.25, 0.2, 0.5]
+    for case in expand_cases({"job": JOB, "parameters": {"mesh_size": sizes}}):
+        assert run_case(case)["status"] == "ok"
+    # 0.5 was used again last, 0.4 is the least recently used mesh and was dropped
+    kept = [json.loads(key)["mesh_size"] for key in sweep._worker_meshes]
+    assert kept == [0.3, 0.25, 0.2, 0.5]
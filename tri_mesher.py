@@ -0,0 +1,25 @@
+import numpy as np
+from meshpy import triangle
+
+from higher_order import elevate_order
+
+
+# Function to mesh a rectangular plate with triangle and return (vertices, elements) arrays
+# order=2 adds midside nodes for 6-node triangles
+def mesh_plate(width, length, mesh_size, order=1):
+    # Define the points of the plate
+    points = [(0.0, 0.0), (width, 0.0), (width, length), (0.0, length)]
+
+    # Create triangle mesh
+    info = triangle.MeshInfo()
+    info.set_points(points)
+    info.set_facets([(0, 1), (1, 2), (2, 3), (3, 0)])
+    mesh = triangle.build(info, max_volume=mesh_size)
+
+    vertices = np.array(mesh.points)
+    elements = np.array(mesh.elements)
+
+    if order == 2:
+        return elevate_order(vertices, elements)
+
+    return vertices, elements
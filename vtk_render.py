@@ -1,11 +1,13 @@
 import csv
-import os
-import subprocess
 
+import numpy as np
 import vtk
 from PySide6.QtGui import QStandardItem, QStandardItemModel
 from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QPushButton, QTabWidget, QLabel, QLineEdit, QTableView, QSplitter, QFileDialog
 from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
+from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray
+
+from gmsh_mesher import mesh_plate
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -361,42 +363,22 @@ class MainWindow(QMainWindow):
         width = float(self.width_input.text())
         height = float(self.height_input.text())
 
-        # Generate input file for Gmsh
-        input_file_contents = f"""
-        // Define geometry
-        // Rectangle for wall
-        Rectangle(1) = {{0, 0, 0, {width}, {height}, 0}};
-
-        // Define mesh parameters
-        Mesh.CharacteristicLengthMin = 0.1;
-        Mesh.CharacteristicLengthMax = 1.0;
-
-        // Define meshing algorithm
-        Mesh.Algorithm = 2; // Quad meshing algorithm
-
-        // Generate mesh
-        Mesh 2;
-        """
+        # Mesh the wall in the shared gmsh session (no input/output files), triangles as gmsh -2 gave before
+        vertices, elements = mesh_plate(width, height, 1.0, recombine=False)
 
-        # Write input file
-        input_file_path = "mesh_input.geo"
-        with open(input_file_path, "w") as f:
-            f.write(input_file_contents)
-
-        # Call Gmsh to generate mesh
-        subprocess.run(["gmsh", "-2", input_file_path])
-
-        # Remove input file
-        os.remove(input_file_path)
+        # Build an unstructured grid straight from the mesh arrays
+        points = vtk.vtkPoints()
+        points.SetData(numpy_to_vtk(np.ascontiguousarray(vertices, dtype=np.float64), deep=True))
 
-        # Load the generated mesh
-        mesh_file_path = "mesh_input.msh"
-        reader = vtk.vtkGenericDataObjectReader()
-        reader.SetFileName(mesh_file_path)
-        reader.Update()
+        nodes_per_cell = elements.shape[1]
+        offsets = np.arange(0, elements.size + 1, nodes_per_cell, dtype=np.int64)
+        cells = vtk.vtkCellArray()
+        cells.SetData(numpy_to_vtkIdTypeArray(offsets, deep=True),
+                      numpy_to_vtkIdTypeArray(elements.astype(np.int64).ravel(), deep=True))
 
-        # Get the output of the reader
-        output = reader.GetOutput()
+        output = vtk.vtkUnstructuredGrid()
+        output.SetPoints(points)
+        output.SetCells(vtk.VTK_QUAD if nodes_per_cell == 4 else vtk.VTK_TRIANGLE, cells)
 
         # Create mapper
         mapper = vtk.vtkDataSetMapper()